@@ -0,0 +1,228 @@
+"""
+Load benchmarks of the knowledge_toolbox tools against the local stand-in Knowledge API.
+
+Invokes each tool as the plugin runtime does, with the given concurrency, and reports
+throughput, latency percentiles and API requests per invocation:
+
+    python _benchmarks/benchmark_tools.py --iterations 50 --concurrency 8 --latency-ms 20
+
+Scenarios can be selected with --scenario (repeatable). Pass --api-base-url to run against
+a stand-in started separately (or a real Dify instance with --api-key, --dataset-id and
+--document-id), instead of an in-process stand-in.
+"""
+
+import dify_plugin  # noqa: F401  # Patches the standard library with gevent first, as in the plugin runtime
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_knowledge_api import (  # noqa: E402
+    FakeKnowledgeAPIServer,
+    add_config_arguments,
+    config_from_arguments,
+    dataset_id,
+    document_id,
+    segment_content,
+)
+from tools.add_file_url_to_citations.add_file_url_to_citations import AddFileURLToCitationsTool  # noqa: E402
+from tools.download_file.download_file import DownloadFileTool  # noqa: E402
+from tools.get_full_doc.get_full_doc import GetFullDocTool  # noqa: E402
+from tools.get_full_docs.get_full_docs import GetFullDocsTool  # noqa: E402
+from tools.utils.knowledge_api import clear_caches  # noqa: E402
+
+
+@dataclass
+class Scenario:
+    name: str
+    tool_class: type
+    parameters: Callable[[int], dict[str, Any]]  # Parameters of the i-th invocation
+    cached: bool = True  # Keep the in-process caches between invocations
+
+
+@dataclass
+class Result:
+    invocations: int
+    seconds: float
+    latencies: list[float]
+    output_bytes: int
+    requests: int | None
+    errors: int
+
+
+def build_scenarios(dataset: str, documents: list[str], citations: int) -> list[Scenario]:
+    def document(index: int) -> str:
+        return documents[index % len(documents)]
+
+    context = json.dumps(
+        [
+            {
+                "content": segment_content(document(index), index, 200),
+                "title": f"{document(index)}.txt",
+                "metadata": {
+                    "dataset_id": dataset,
+                    "document_id": document(index),
+                    "document_name": f"{document(index)}.txt",
+                    "score": 0.5,
+                },
+            }
+            for index in range(citations)
+        ]
+    )
+
+    def full_doc(mode: str) -> Callable[[int], dict[str, Any]]:
+        return lambda index: {
+            "knowledge_id": dataset,
+            "document_id": document(index),
+            "output_mode": mode,
+            "use_cache": True,
+        }
+
+    def download(format: str) -> Callable[[int], dict[str, Any]]:
+        return lambda index: {"knowledge_id": dataset, "document_id": document(index), "format": format}
+
+    def citations_format(format: str) -> Callable[[int], dict[str, Any]]:
+        return lambda index: {"context": context, "format": format}
+
+    return [
+        Scenario("get_full_doc/text/cold", GetFullDocTool, full_doc("text"), cached=False),
+        Scenario("get_full_doc/text/warm", GetFullDocTool, full_doc("text")),
+        Scenario("get_full_doc/chunked_text/cold", GetFullDocTool, full_doc("chunked_text"), cached=False),
+        Scenario("get_full_doc/file/cold", GetFullDocTool, full_doc("file"), cached=False),
+        Scenario(
+            "get_full_docs/json/cold",
+            GetFullDocsTool,
+            lambda index: {"knowledge_id": dataset, "document_ids": ",".join(documents), "format": "json"},
+            cached=False,
+        ),
+        Scenario("download_file/url/cold", DownloadFileTool, download("url"), cached=False),
+        Scenario("download_file/url/warm", DownloadFileTool, download("url")),
+        Scenario("download_file/file/warm", DownloadFileTool, download("file")),
+        Scenario("download_file/content/warm", DownloadFileTool, download("content")),
+        Scenario("add_file_url_to_citations/full/cold", AddFileURLToCitationsTool, citations_format("full"), cached=False),
+        Scenario("add_file_url_to_citations/full/warm", AddFileURLToCitationsTool, citations_format("full")),
+        Scenario(
+            "add_file_url_to_citations/chunks_markdown/warm",
+            AddFileURLToCitationsTool,
+            citations_format("chunks_markdown"),
+        ),
+    ]
+
+
+def output_size(message) -> int:
+    inner = message.message
+    if hasattr(inner, "text"):
+        return len(inner.text.encode("utf-8"))
+    if hasattr(inner, "blob"):
+        return len(inner.blob)
+    return 0
+
+
+def run_scenario(
+    scenario: Scenario,
+    credentials: dict[str, str],
+    iterations: int,
+    concurrency: int,
+    server: FakeKnowledgeAPIServer | None,
+) -> Result:
+    tool = scenario.tool_class.from_credentials(credentials)
+
+    def invoke(index: int) -> tuple[float, int, bool]:
+        started = time.perf_counter()
+        size = 0
+        error = False
+        for message in tool._invoke(scenario.parameters(index)):
+            size += output_size(message)
+            text = getattr(message.message, "text", "")
+            error = error or text.startswith("Error")
+        return time.perf_counter() - started, size, error
+
+    # warm up connections (and caches, for cached scenarios) outside of the measurement
+    invoke(0)
+    if not scenario.cached:
+        clear_caches()
+    if server:
+        server.reset_counters()
+
+    def measured(index: int) -> tuple[float, int, bool]:
+        if not scenario.cached:
+            clear_caches()
+        return invoke(index)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(measured, range(iterations)))
+    seconds = time.perf_counter() - started
+
+    return Result(
+        invocations=iterations,
+        seconds=seconds,
+        latencies=[outcome[0] for outcome in outcomes],
+        output_bytes=sum(outcome[1] for outcome in outcomes),
+        requests=server.request_count if server else None,
+        errors=sum(outcome[2] for outcome in outcomes),
+    )
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the knowledge_toolbox tools")
+    parser.add_argument("--scenario", action="append", help="Run only scenarios whose name starts with this")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--citations", type=int, default=200, help="Number of citations in the retrieval context")
+    parser.add_argument("--api-base-url", help="Use a running Knowledge API instead of an in-process stand-in")
+    parser.add_argument("--api-key", default="benchmark")
+    parser.add_argument("--dataset-id", default=dataset_id(0))
+    parser.add_argument("--document-id", action="append", help="Documents to use (default: all generated ones)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    api_base_url = args.api_base_url
+    if not api_base_url:
+        server = FakeKnowledgeAPIServer(config_from_arguments(args)).start()
+        api_base_url = server.api_base_url
+    documents = args.document_id or [document_id(index) for index in range(args.documents)]
+    credentials = {"api_base_url": api_base_url, "api_key": args.api_key}
+
+    scenarios = [
+        scenario
+        for scenario in build_scenarios(args.dataset_id, documents, args.citations)
+        if not args.scenario or any(scenario.name.startswith(prefix) for prefix in args.scenario)
+    ]
+
+    print(f"{'scenario':<48} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'MB/s':>8} {'req/op':>7} {'errors':>6}")
+    try:
+        for scenario in scenarios:
+            result = run_scenario(scenario, credentials, args.iterations, args.concurrency, server)
+            requests = f"{result.requests / result.invocations:.1f}" if result.requests is not None else "-"
+            print(
+                f"{scenario.name:<48} {result.invocations / result.seconds:>8.1f}"
+                f" {statistics.median(result.latencies) * 1000:>9.1f}"
+                f" {percentile(result.latencies, 0.95) * 1000:>9.1f}"
+                f" {max(result.latencies) * 1000:>9.1f}"
+                f" {result.output_bytes / result.seconds / 1e6:>8.1f}"
+                f" {requests:>7} {result.errors:>6}"
+            )
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
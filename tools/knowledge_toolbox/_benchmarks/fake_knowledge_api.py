@@ -0,0 +1,258 @@
+"""
+Local stand-in for the Dify Knowledge API, to exercise and benchmark the tools without a Dify instance.
+
+Serves the following endpoints under /v1, with generated datasets, documents, segments and files:
+
+- GET /datasets
+- GET /datasets/{dataset_id}/documents
+- GET /datasets/{dataset_id}/documents/{document_id}/segments
+- GET /datasets/{dataset_id}/documents/{document_id}/upload-file
+
+and the download urls returned by upload-file. Any api key is accepted.
+
+Run it standalone and set its base url (e.g. http://127.0.0.1:5001/v1) as the Knowledge API base URL:
+
+    python _benchmarks/fake_knowledge_api.py --port 5001 --latency-ms 20 --failure-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FILE_CHUNK_SIZE = 65536
+
+
+@dataclass
+class FakeKnowledgeAPIConfig:
+    datasets: int = 1
+    documents: int = 20  # Per dataset
+    segments: int = 500  # Per document
+    segment_chars: int = 500
+    file_bytes: int = 1024 * 1024
+    latency_ms: float = 20.0  # Added to every response
+    jitter_ms: float = 5.0
+    failure_rate: float = 0.0  # Fraction of API requests answered with 503
+    max_page_limit: int = 100
+    seed: int = 0
+
+
+def dataset_id(index: int) -> str:
+    return f"dataset-{index}"
+
+
+def document_id(index: int) -> str:
+    return f"document-{index}"
+
+
+def segment_content(document: str, position: int, chars: int) -> str:
+    text = f"{document} segment {position}. "
+    return (text + "Lorem ipsum dolor sit amet. " * (chars // 28 + 1))[:chars]
+
+
+class FakeKnowledgeAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 stalls concurrent clients on connect retries
+
+    def __init__(self, config: FakeKnowledgeAPIConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), FakeKnowledgeAPIHandler)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.failure_count = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    @property
+    def api_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.request_count = 0
+            self.failure_count = 0
+
+    def start(self) -> "FakeKnowledgeAPIServer":
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakeKnowledgeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections alive, as Dify does
+    server: FakeKnowledgeAPIServer
+
+    routes = [
+        (re.compile(r"^/v1/datasets$"), "list_datasets"),
+        (re.compile(r"^/v1/datasets/(?P<dataset>[^/]+)/documents$"), "list_documents"),
+        (re.compile(r"^/v1/datasets/(?P<dataset>[^/]+)/documents/(?P<document>[^/]+)/segments$"), "list_segments"),
+        (re.compile(r"^/v1/datasets/(?P<dataset>[^/]+)/documents/(?P<document>[^/]+)/upload-file$"), "upload_file"),
+        (re.compile(r"^/files/(?P<dataset>[^/]+)/(?P<document>[^/]+)/file-preview$"), "download_file"),
+    ]
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        with self.server.lock:
+            self.server.request_count += 1
+            delay = max(0.0, config.latency_ms + self.server.random.uniform(-config.jitter_ms, config.jitter_ms))
+            fail = self.server.random.random() < config.failure_rate
+            if fail:
+                self.server.failure_count += 1
+        time.sleep(delay / 1000)
+
+        for pattern, name in self.routes:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            self._send_json(404, {"code": "not_found", "message": "Not Found", "status": 404})
+            return
+
+        if name != "download_file":
+            if not self.headers.get("authorization", "").lower().startswith("bearer "):
+                self._send_json(401, {"code": "unauthorized", "message": "Unauthorized", "status": 401})
+                return
+            if fail:
+                self._send_json(503, {"code": "unavailable", "message": "Injected failure", "status": 503})
+                return
+        if not self._exists(match.groupdict()):
+            self._send_json(404, {"code": "not_found", "message": "Document not found", "status": 404})
+            return
+        getattr(self, name)(query, **match.groupdict())
+
+    def _exists(self, ids: dict[str, str]) -> bool:
+        config = self.server.config
+        if "dataset" in ids and ids["dataset"] not in {dataset_id(index) for index in range(config.datasets)}:
+            return False
+        if "document" in ids and ids["document"] not in {document_id(index) for index in range(config.documents)}:
+            return False
+        return True
+
+    def _page(self, query: dict[str, str], total: int) -> tuple[int, int, int, int]:
+        page = max(1, int(query.get("page", 1)))
+        limit = min(self.server.config.max_page_limit, max(1, int(query.get("limit", 20))))
+        start = (page - 1) * limit
+        return page, limit, start, min(start + limit, total)
+
+    def list_datasets(self, query):
+        total = self.server.config.datasets
+        page, limit, start, end = self._page(query, total)
+        data = [{"id": dataset_id(index), "name": f"Dataset {index}"} for index in range(start, end)]
+        self._send_json(200, {"data": data, "has_more": end < total, "limit": limit, "total": total, "page": page})
+
+    def list_documents(self, query, dataset):
+        total = self.server.config.documents
+        page, limit, start, end = self._page(query, total)
+        keyword = query.get("keyword", "")
+        data = [
+            {
+                "id": document_id(index),
+                "name": f"Document {index}.txt",
+                "enabled": True,
+                "archived": False,
+                "indexing_status": "completed",
+                "word_count": self.server.config.segments * self.server.config.segment_chars,
+            }
+            for index in range(start, end)
+            if keyword in f"Document {index}.txt"
+        ]
+        self._send_json(200, {"data": data, "has_more": end < total, "limit": limit, "total": total, "page": page})
+
+    def list_segments(self, query, dataset, document):
+        config = self.server.config
+        page, limit, start, end = self._page(query, config.segments)
+        data = [
+            {
+                "id": f"{document}-segment-{position}",
+                "position": position + 1,
+                "document_id": document,
+                "content": segment_content(document, position, config.segment_chars),
+                "word_count": config.segment_chars,
+                "index_node_hash": f"{document}-{position}",
+                "enabled": True,
+                "status": "completed",
+            }
+            for position in range(start, end)
+        ]
+        self._send_json(
+            200, {"data": data, "has_more": end < config.segments, "limit": limit, "total": config.segments, "page": page}
+        )
+
+    def upload_file(self, query, dataset, document):
+        self._send_json(
+            200,
+            {
+                "id": f"{document}-file",
+                "name": f"{document}.txt",
+                "size": self.server.config.file_bytes,
+                "extension": "txt",
+                "mime_type": "text/plain",
+                "url": f"/files/{dataset}/{document}/file-preview",
+                "download_url": f"{self.server.base_url}/files/{dataset}/{document}/file-preview?as_attachment=true",
+            },
+        )
+
+    def download_file(self, query, dataset, document):
+        size = self.server.config.file_bytes
+        chunk = (f"{document} " * (FILE_CHUNK_SIZE // len(document) + 1)).encode("utf-8")[:FILE_CHUNK_SIZE]
+        self.send_response(200)
+        self.send_header("content-type", "text/plain")
+        self.send_header("content-length", str(size))
+        self.end_headers()
+        for start in range(0, size, FILE_CHUNK_SIZE):
+            self.wfile.write(chunk[: min(FILE_CHUNK_SIZE, size - start)])
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    for field in fields(FakeKnowledgeAPIConfig):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, default=field.default)
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeKnowledgeAPIConfig:
+    return FakeKnowledgeAPIConfig(**{field.name: getattr(args, field.name) for field in fields(FakeKnowledgeAPIConfig)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Dify Knowledge API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeKnowledgeAPIServer(config_from_arguments(args), args.host, args.port)
+    print(f"Serving the Knowledge API at {server.api_base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
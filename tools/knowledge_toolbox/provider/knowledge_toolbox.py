@@ -1,9 +1,10 @@
 from typing import Any
-import requests
 
 from dify_plugin import ToolProvider
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
+from tools.utils.knowledge_api import KnowledgeAPIClient
+
 
 class FileToolsProvider(ToolProvider):
     def _validate_credentials(self, credentials: dict[str, Any]) -> None:
@@ -15,14 +16,7 @@ class FileToolsProvider(ToolProvider):
             raise ToolProviderCredentialValidationError("Knowledge API key is required.")
 
         # get knowledge base list to validate API base URL and key
-        headers = {
-            "authorization": f"bearer {api_key}",
-            "content-type": "application/json",
-        }
-        url = f"{api_base_url.rstrip('/')}/datasets"
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            _ = response.json()
+            _ = KnowledgeAPIClient(api_base_url, api_key).list_datasets()
         except Exception as e:
             raise ToolProviderCredentialValidationError(f"Failed to validate API credentials: {str(e)}")
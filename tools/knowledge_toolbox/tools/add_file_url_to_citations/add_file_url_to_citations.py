@@ -1,13 +1,15 @@
 from collections.abc import Generator
+from html import unescape
 from typing import Any
-import requests
-import ast
 import json
 
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
+from tools.utils.citation_utils import index_documents, parse_context
+from tools.utils.knowledge_api import KnowledgeAPIClient
+
 
 class AddFileURLToCitationsTool(Tool):
 
@@ -28,33 +30,19 @@ class AddFileURLToCitationsTool(Tool):
 
         # convert str to list of dictionaries
         try:
-            context = ast.literal_eval(context)
+            context = parse_context(context)
         except Exception as e:
             yield self.create_text_message("Invalid context format. Please provide a valid context.")
             return
 
-        # gather all documents in context
-        documents = []
-        for citation in context:
-            documents.append({
-                "dataset_id": citation.get("metadata").get("dataset_id"),
-                "document_id": citation.get("metadata").get("document_id"),
-            })
-        documents = [dict(t) for t in {tuple(d.items()) for d in documents}]
-
-        # get the download url for each document
-        headers = {
-            "authorization": f"bearer {api_key}",
-            "content-type": "application/json",
-        }
-        for document in documents:
-            url = f"{api_base_url.rstrip('/')}/datasets/{document['dataset_id']}/documents/{document['document_id']}/upload-file"
-            try:
-                response = requests.get(url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-            except Exception as e:
-                data = {}
+        # gather all documents in context, indexed by (dataset_id, document_id) in order of appearance
+        documents = index_documents(context)
+
+        # get the download url for each document, looking up all documents concurrently
+        client = KnowledgeAPIClient(api_base_url, api_key)
+        upload_files = client.get_upload_files(list(documents))
+        for document, upload_file in zip(documents.values(), upload_files):
+            data = upload_file or {}
 
             document["download_url"] = data.get("download_url", "")
             document['name'] = data.get("name", "")
@@ -64,35 +52,29 @@ class AddFileURLToCitationsTool(Tool):
         # full: inject download urls into original context
         if format == "full":
             for citation in context:
-                for document in documents:
-                    if (citation.get("metadata").get("dataset_id") == document.get("dataset_id") and
-                            citation.get("metadata").get("document_id") == document.get("document_id")):
-                        citation["metadata"]["download_url"] = document.get(
-                            "download_url")
+                meta = citation.get("metadata", {})
+                meta["download_url"] = documents[(meta.get("dataset_id"), meta.get("document_id"))]["download_url"]
             yield self.create_text_message(json.dumps(context, ensure_ascii=False))
 
         # minimal_json: return only referenced documents with download urls
         elif format == "minimal_json":
-            yield self.create_text_message(json.dumps(documents, ensure_ascii=False))
+            yield self.create_text_message(json.dumps(list(documents.values()), ensure_ascii=False))
 
         # minimal_markdown: return list of documents with download urls in markdown format
         elif format == "minimal_markdown":
-            list = []
-            for document in documents:
-                list.append(
-                    f"- [{document.get('name')}]({document.get('download_url')})")
-            yield self.create_text_message("\n".join(list))
+            links = [
+                f"- [{document.get('name')}]({document.get('download_url')})" for document in documents.values()
+            ]
+            yield self.create_text_message("\n".join(links))
 
         # chunks_html: group by documents, attach chunks, and output as HTML details
         elif format == "chunks_markdown":
-            from html import unescape
-
             doc_dict = {}
             for citation in context:
                 meta = citation.get("metadata", {})
                 key = (meta.get("dataset_id"), meta.get("document_id"))
                 if key not in doc_dict:
-                    doc_info = next((d for d in documents if d.get("dataset_id") == key[0] and d.get("document_id") == key[1]), {})
+                    doc_info = documents[key]
                     doc_dict[key] = {
                         "name": meta.get("document_name", doc_info.get("name", "")),
                         "download_url": doc_info.get("download_url", ""),
@@ -104,14 +86,13 @@ class AddFileURLToCitationsTool(Tool):
             for doc in doc_dict.values():
                 doc_name = doc.get("name", "")
                 download_url = doc.get("download_url", "")
-                block = f"<details>\n<summary>{doc_name} ({len(doc['chunks'])})</summary>\n\n"
-                block += f"💾 [{doc_name}]({download_url})\n\n"
-                for i, content in enumerate(doc["chunks"]):
-                    content = unescape(content)
-                    quoted = "\n".join(["> " + line for line in content.splitlines()])
-                    block += quoted
-                    if i != len(doc["chunks"]) - 1:
-                        block += "\n\n"
-                block += "\n</details>"
-                html_blocks.append(block)
+                quoted_chunks = [
+                    "\n".join(["> " + line for line in unescape(content).splitlines()]) for content in doc["chunks"]
+                ]
+                html_blocks.append(
+                    f"<details>\n<summary>{doc_name} ({len(doc['chunks'])})</summary>\n\n"
+                    f"💾 [{doc_name}]({download_url})\n\n"
+                    + "\n\n".join(quoted_chunks)
+                    + "\n</details>"
+                )
             yield self.create_text_message("\n\n".join(html_blocks))
@@ -1,12 +1,19 @@
 from collections.abc import Generator
 from typing import Any
 import json
-import requests
 
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
+from tools.utils.knowledge_api import KnowledgeAPIClient
+from tools.utils.message_utils import iter_blob_chunk_messages
+
+# Dify rejects files larger than 30 MB from plugins
+DEFAULT_MAX_SIZE_MB = 30
+# Appended to content cut at max_content_chars, so that downstream nodes can tell it is partial
+TRUNCATION_NOTICE = "\n\n[Truncated: the file is longer than {max_content_chars} characters.]"
+
 
 class DownloadFileTool(Tool):
 
@@ -14,6 +21,9 @@ class DownloadFileTool(Tool):
         knowledge_id = tool_parameters.get("knowledge_id")
         document_id = tool_parameters.get("document_id")
         format = tool_parameters.get("format", "url")
+        max_size_mb = tool_parameters.get("max_size_mb") or DEFAULT_MAX_SIZE_MB
+        max_content_chars = int(tool_parameters.get("max_content_chars") or 0)
+        max_bytes = int(float(max_size_mb) * 1024 * 1024)
 
         if not self.runtime or not self.runtime.credentials:
             raise ToolProviderCredentialValidationError("Tool runtime or credentials are missing")
@@ -27,16 +37,10 @@ class DownloadFileTool(Tool):
             raise ToolProviderCredentialValidationError("Knowledge API key is required.")
 
         # step 1: get the upload-file endpoint
-        url = f"{api_base_url.rstrip('/')}/datasets/{knowledge_id}/documents/{document_id}/upload-file"
-        headers = {
-            "authorization": f"bearer {api_key}",
-            "content-type": "application/json",
-        }
+        client = KnowledgeAPIClient(api_base_url, api_key)
 
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            data = client.get_upload_file(knowledge_id, document_id)
             download_url = data.get("download_url")
         except Exception as e:
             yield self.create_text_message(
@@ -62,32 +66,38 @@ class DownloadFileTool(Tool):
             yield self.create_text_message(markdown_link)
             return
 
-        # step 2: fetch the file
-        try:
-            file_response = requests.get(download_url)
-            file_response.raise_for_status()
-            file_bytes = file_response.content
-        except Exception as e:
-            yield self.create_text_message(
-                f"Error downloading file: {str(e)}"
-            )
-            return
-
+        # step 2: stream the file
         if format == "content":
             try:
-                text = file_bytes.decode("utf-8")
-                yield self.create_text_message(text)
-            except Exception as e:
+                text, truncated = client.download_text(download_url, max_bytes, max_content_chars)
+            except UnicodeDecodeError as e:
                 yield self.create_text_message(
                     f"Error decoding file as UTF-8 text: {str(e)}"
                 )
+                return
+            except Exception as e:
+                yield self.create_text_message(
+                    f"Error downloading file: {str(e)}"
+                )
+                return
+            if truncated:
+                text += TRUNCATION_NOTICE.format(max_content_chars=max_content_chars)
+            yield self.create_text_message(text)
             return
         elif format == "file":
-            yield self.create_blob_message(
-                blob=file_bytes,
-                meta={
-                    "mime_type": data.get("mime_type"),
-                    "filename": data.get("name"),
-                },
-            )
+            try:
+                file = client.download_to_file(download_url, max_bytes)
+            except Exception as e:
+                yield self.create_text_message(
+                    f"Error downloading file: {str(e)}"
+                )
+                return
+            with file:
+                yield from iter_blob_chunk_messages(
+                    file,
+                    meta={
+                        "mime_type": data.get("mime_type"),
+                        "filename": data.get("name"),
+                    },
+                )
             return
@@ -1,11 +1,14 @@
 from collections.abc import Generator
 from typing import Any
-import requests
+import tempfile
 
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
+from tools.utils.knowledge_api import DOWNLOAD_SPOOL_MAX_BYTES, KnowledgeAPIClient
+from tools.utils.message_utils import iter_blob_chunk_messages, iter_joined_chunks
+
 
 class GetFullDocTool(Tool):
 
@@ -13,6 +16,8 @@ class GetFullDocTool(Tool):
         knowledge_id = tool_parameters.get("knowledge_id")
         document_id = tool_parameters.get("document_id")
         delimiter = tool_parameters.get("delimiter", "\n\n").encode().decode("unicode_escape")
+        output_mode = tool_parameters.get("output_mode") or "text"
+        use_cache = bool(tool_parameters.get("use_cache", False))
 
         if not self.runtime or not self.runtime.credentials:
             raise ToolProviderCredentialValidationError("Tool runtime or credentials are missing")
@@ -25,31 +30,49 @@ class GetFullDocTool(Tool):
         if not api_key:
             raise ToolProviderCredentialValidationError("Knowledge API key is required.")
 
-        url = f"{api_base_url.rstrip('/')}/datasets/{knowledge_id}/documents/{document_id}/segments"
-        headers = {
-            "authorization": f"bearer {api_key}",
-            "content-type": "application/json",
-        }
+        client = KnowledgeAPIClient(api_base_url, api_key)
 
-        all_data = []
-        page = 1
-        has_more = True
-        params = {"limit": 100}
+        # text: a single message with the full doc
+        if output_mode not in ("chunked_text", "file"):
+            try:
+                contents = client.get_document_contents(knowledge_id, document_id, use_cache=use_cache)
+            except Exception as e:
+                yield self.create_text_message(f"Error fetching segments: {str(e)}")
+                return
+            yield self.create_text_message(delimiter.join(contents))
+            return
 
+        # the first page is fetched before any output, so that a missing document is reported on its own
         try:
-            while has_more:
-                params["page"] = page
-                response = requests.get(url, headers=headers, params=params)
-                if response.status_code != 200:
-                    raise Exception(f"{response.status_code} {response.text}")
-                resp_json = response.json()
-                all_data.extend(resp_json.get("data", []))
-                has_more = resp_json.get("has_more", False)
-                page += 1
+            contents = client.iter_document_contents(knowledge_id, document_id, use_cache=use_cache)
         except Exception as e:
             yield self.create_text_message(f"Error fetching segments: {str(e)}")
             return
 
-        text = delimiter.join([segment.get("content", "")
-                              for segment in all_data])
-        yield self.create_text_message(text)
+        # chunked_text: emit size-bounded text messages while pages arrive
+        if output_mode == "chunked_text":
+            emitted = False
+            try:
+                for chunk in iter_joined_chunks(contents, delimiter):
+                    yield self.create_text_message(chunk)
+                    emitted = True
+            except Exception as e:
+                if not emitted:
+                    yield self.create_text_message(f"Error fetching segments: {str(e)}")
+                else:
+                    yield self.create_text_message(
+                        f"\n\nError: the output above is truncated, fetching segments failed: {str(e)}"
+                    )
+            return
+
+        # file: write the text to a temporary file while pages arrive, then send it as a file
+        with tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES) as file:
+            try:
+                for chunk in iter_joined_chunks(contents, delimiter):
+                    file.write(chunk.encode("utf-8"))
+            except Exception as e:
+                yield self.create_text_message(f"Error fetching segments: {str(e)}")
+                return
+            yield from iter_blob_chunk_messages(
+                file, meta={"mime_type": "text/markdown", "filename": f"{document_id}.md"}
+            )
@@ -0,0 +1,78 @@
+from collections.abc import Generator
+from typing import Any
+import json
+import re
+
+from dify_plugin import Tool
+from dify_plugin.entities.tool import ToolInvokeMessage
+from dify_plugin.errors.tool import ToolProviderCredentialValidationError
+
+from tools.utils.knowledge_api import KnowledgeAPIClient
+
+
+class GetFullDocsTool(Tool):
+
+    def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage]:
+        knowledge_id = tool_parameters.get("knowledge_id")
+        document_ids = re.split(r"[\s,]+", tool_parameters.get("document_ids") or "")
+        document_ids = list(dict.fromkeys(document_id for document_id in document_ids if document_id))
+        keyword = tool_parameters.get("keyword") or None
+        format = tool_parameters.get("format", "text")
+        delimiter = tool_parameters.get("delimiter", "\n\n").encode().decode("unicode_escape")
+        document_delimiter = tool_parameters.get("document_delimiter", "\n\n---\n\n").encode().decode("unicode_escape")
+        use_cache = bool(tool_parameters.get("use_cache", False))
+
+        if not self.runtime or not self.runtime.credentials:
+            raise ToolProviderCredentialValidationError("Tool runtime or credentials are missing")
+
+        api_base_url = self.runtime.credentials.get("api_base_url")
+        api_key = self.runtime.credentials.get("api_key")
+
+        if not api_base_url:
+            raise ToolProviderCredentialValidationError("Knowledge API base URL is required.")
+        if not api_key:
+            raise ToolProviderCredentialValidationError("Knowledge API key is required.")
+
+        client = KnowledgeAPIClient(api_base_url, api_key)
+
+        # step 1: without document ids, target all available documents in the knowledge
+        names = {}
+        if not document_ids:
+            try:
+                documents = client.list_documents(knowledge_id, keyword)
+            except Exception as e:
+                yield self.create_text_message(f"Error fetching documents: {str(e)}")
+                return
+            documents = [
+                document
+                for document in documents
+                if document.get("enabled", True)
+                and not document.get("archived", False)
+                and document.get("indexing_status", "completed") == "completed"
+            ]
+            document_ids = [document.get("id") for document in documents]
+            names = {document.get("id"): document.get("name", "") for document in documents}
+
+        # step 2: fetch the segments of all documents concurrently
+        results = client.get_documents_contents(knowledge_id, document_ids, use_cache=use_cache)
+
+        if format == "json":
+            output = []
+            for document_id, result in zip(document_ids, results):
+                item = {"document_id": document_id}
+                if document_id in names:
+                    item["name"] = names[document_id]
+                if isinstance(result, Exception):
+                    item["error"] = str(result)
+                else:
+                    item["content"] = delimiter.join(result)
+                output.append(item)
+            yield self.create_text_message(json.dumps(output, ensure_ascii=False))
+            return
+
+        for document_id, result in zip(document_ids, results):
+            if isinstance(result, Exception):
+                yield self.create_text_message(f"Error fetching segments of {document_id}: {str(result)}")
+                return
+        text = document_delimiter.join(delimiter.join(result) for result in results)
+        yield self.create_text_message(text)
@@ -0,0 +1,32 @@
+from typing import Any
+import ast
+import json
+
+
+def parse_context(context: str) -> list[dict[str, Any]]:
+    """
+    Parse the result of the Knowledge Retrieval node passed as a string.
+
+    The context is usually JSON, but falls back to a Python literal, which is what a
+    Template node renders for Array[Object] (single quotes, None, True, ...).
+    """
+    try:
+        citations = json.loads(context)
+    except ValueError:
+        citations = ast.literal_eval(context)
+    if not isinstance(citations, list) or not all(isinstance(citation, dict) for citation in citations):
+        raise ValueError("The context must be a list of objects")
+    return citations
+
+
+def index_documents(context: list[dict[str, Any]]) -> dict[tuple[str, str], dict[str, Any]]:
+    """
+    Return the documents cited in the context, keyed by (dataset_id, document_id) in order of first appearance.
+    """
+    documents = {}
+    for citation in context:
+        meta = citation.get("metadata", {})
+        key = (meta.get("dataset_id"), meta.get("document_id"))
+        if key not in documents:
+            documents[key] = {"dataset_id": key[0], "document_id": key[1]}
+    return documents
@@ -0,0 +1,398 @@
+import codecs
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import IO, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tools.utils.ttl_cache import TTLCache
+
+SEGMENTS_PAGE_LIMIT = 100
+DOCUMENTS_PAGE_LIMIT = 100
+MAX_CONCURRENT_PAGES = 8
+MAX_CONCURRENT_LOOKUPS = 8
+MAX_CONCURRENT_DOCUMENTS = 8
+MAX_CONCURRENT_PAGES_PER_DOCUMENT = 2  # Keeps requests in flight within POOL_MAXSIZE when fetching many documents
+
+REQUEST_TIMEOUT = (10, 60)  # (connect, read) in seconds
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5  # Sleeps 0.5s, 1s, 2s between retries
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+POOL_MAXSIZE = 16  # Keep-alive connections per host, above MAX_CONCURRENT_PAGES
+
+DOWNLOAD_CHUNK_SIZE = 8192
+DOWNLOAD_SPOOL_MAX_BYTES = 8 * 1024 * 1024  # Larger downloads are spooled to disk
+
+# Download urls in upload-file responses are signed and expire after 5 minutes by default
+# (FILES_ACCESS_TIMEOUT), so cached responses expire well before them
+UPLOAD_FILE_CACHE_TTL_SEC = 240
+UPLOAD_FILE_CACHE_MAX_ENTRIES = 1024
+
+# Cached documents are validated against their first page of segments on every use, and
+# also expire so that edits beyond the first page show up within a bounded time
+DOCUMENT_CACHE_MAX_AGE_SEC = 600
+DOCUMENT_CACHE_MAX_ENTRIES = 64
+
+CACHE_DIR_ENV = "KNOWLEDGE_TOOLBOX_CACHE_DIR"  # Optional directory shared between plugin processes
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _cache_directory(name: str) -> str | None:
+    root_dir = os.environ.get(CACHE_DIR_ENV)
+    return os.path.join(root_dir, name) if root_dir else None
+
+
+_upload_file_cache = TTLCache(
+    UPLOAD_FILE_CACHE_TTL_SEC, UPLOAD_FILE_CACHE_MAX_ENTRIES, directory=_cache_directory("upload_files")
+)
+_document_cache = TTLCache(
+    DOCUMENT_CACHE_MAX_AGE_SEC, DOCUMENT_CACHE_MAX_ENTRIES, directory=_cache_directory("documents")
+)
+
+
+def clear_caches() -> None:
+    """
+    Drop all cached upload-file responses and documents held in this process.
+    """
+    _upload_file_cache.clear()
+    _document_cache.clear()
+
+
+class DownloadTooLargeError(Exception):
+    pass
+
+
+def get_session(api_base_url: str) -> requests.Session:
+    """
+    Return the shared session for an API base URL, creating it on first use.
+
+    Sessions keep connections alive across tool invocations, and retry idempotent
+    requests (GET/HEAD) with exponential backoff on connection errors and transient
+    status codes.
+    """
+    key = api_base_url.rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            retry = Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_FORCELIST,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+                respect_retry_after_header=False,  # A long Retry-After would stall the tool; keep the backoff
+            )
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
+
+
+class KnowledgeAPIClient:
+    """
+    Client for the Dify Knowledge API over the shared session of its base URL.
+    """
+
+    def __init__(self, api_base_url: str, api_key: str):
+        self.api_base_url = api_base_url.rstrip("/")
+        # cached responses are only shared between callers with the same api key
+        self.cache_scope = hashlib.sha256(f"{self.api_base_url}\0{api_key}".encode("utf-8")).hexdigest()
+        self.headers = {
+            "authorization": f"bearer {api_key}",
+            "content-type": "application/json",
+        }
+        self.session = get_session(self.api_base_url)
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> requests.Response:
+        return self.session.get(
+            f"{self.api_base_url}{path}", headers=self.headers, params=params, timeout=REQUEST_TIMEOUT
+        )
+
+    def download(self, url: str, stream: bool = False) -> requests.Response:
+        # download urls are signed, so the api key is not sent along
+        return self.session.get(url, stream=stream, timeout=REQUEST_TIMEOUT)
+
+    def iter_download(self, url: str, max_bytes: int | None = None) -> Iterator[bytes]:
+        """
+        Stream a file in chunks of DOWNLOAD_CHUNK_SIZE bytes.
+
+        Raises DownloadTooLargeError before reading the body if Content-Length exceeds
+        max_bytes, or as soon as the received data does when the length is not reported.
+        """
+        with self.download(url, stream=True) as response:
+            response.raise_for_status()
+            content_length = response.headers.get("content-length", "")
+            if max_bytes is not None and content_length.isdigit() and int(content_length) > max_bytes:
+                raise DownloadTooLargeError(f"File size {int(content_length)} bytes exceeds the limit of {max_bytes} bytes")
+            received = 0
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                if max_bytes is not None and received > max_bytes:
+                    raise DownloadTooLargeError(f"File size exceeds the limit of {max_bytes} bytes")
+                yield chunk
+
+    def download_to_file(self, url: str, max_bytes: int | None = None) -> IO[bytes]:
+        """
+        Download a file into a temporary file that spills over to disk above DOWNLOAD_SPOOL_MAX_BYTES.
+
+        The returned file is positioned at the start, and the caller is responsible for closing it.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES)
+        try:
+            for chunk in self.iter_download(url, max_bytes):
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    def download_text(
+        self, url: str, max_bytes: int | None = None, max_chars: int | None = None
+    ) -> tuple[str, bool]:
+        """
+        Download a file and decode it incrementally as UTF-8 text.
+
+        Returns the text and whether it was cut at max_chars. With max_chars, the download
+        stops once more than that many characters are decoded, so max_bytes only applies
+        to the whole file otherwise. Raises UnicodeDecodeError if the file is not valid UTF-8.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        parts: list[str] = []
+        length = 0
+        with closing(self.iter_download(url, None if max_chars else max_bytes)) as chunks:
+            for chunk in chunks:
+                text = decoder.decode(chunk)
+                if max_chars and length + len(text) > max_chars:
+                    parts.append(text[: max_chars - length])
+                    return "".join(parts), True
+                parts.append(text)
+                length += len(text)
+        text = decoder.decode(b"", final=True)
+        if max_chars and length + len(text) > max_chars:
+            return "".join(parts) + text[: max_chars - length], True
+        parts.append(text)
+        return "".join(parts), False
+
+    def list_datasets(self) -> dict[str, Any]:
+        response = self.get("/datasets")
+        response.raise_for_status()
+        return response.json()
+
+    def list_documents(self, dataset_id: str, keyword: str | None = None) -> list[dict[str, Any]]:
+        """
+        Return all documents of a dataset, optionally only those whose name contains keyword.
+        """
+        documents = []
+        page = 1
+        while True:
+            params = {"page": page, "limit": DOCUMENTS_PAGE_LIMIT}
+            if keyword:
+                params["keyword"] = keyword
+            response = self.get(f"/datasets/{dataset_id}/documents", params=params)
+            response.raise_for_status()
+            data = response.json()
+            documents.extend(data.get("data", []))
+            if not data.get("has_more", False):
+                return documents
+            page += 1
+
+    def get_upload_file(self, dataset_id: str, document_id: str) -> dict[str, Any]:
+        """
+        Return the upload-file metadata (name, size, download_url, ...) of a document.
+
+        Responses are cached for a few minutes per (api base url and key, dataset, document),
+        so hot documents cost no API calls on repeated queries.
+        """
+        cache_key = json.dumps([self.cache_scope, dataset_id, document_id])
+        data = _upload_file_cache.get(cache_key)
+        if data is not None:
+            return data
+
+        response = self.get(f"/datasets/{dataset_id}/documents/{document_id}/upload-file")
+        response.raise_for_status()
+        data = response.json()
+        _upload_file_cache.set(cache_key, data)
+        return data
+
+    def get_upload_files(
+        self,
+        documents: list[tuple[str, str]],
+        max_workers: int = MAX_CONCURRENT_LOOKUPS,
+    ) -> list[dict[str, Any] | None]:
+        """
+        Look up the upload-file metadata of many (dataset_id, document_id) pairs concurrently.
+
+        Results are returned in the input order. A failed lookup is returned as None
+        without affecting the others.
+        """
+
+        def lookup(document: tuple[str, str]) -> dict[str, Any] | None:
+            try:
+                return self.get_upload_file(*document)
+            except Exception:
+                return None
+
+        if len(documents) <= 1:
+            return [lookup(document) for document in documents]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(documents))) as executor:
+            return list(executor.map(lookup, documents))
+
+    def get_segment_page(
+        self, dataset_id: str, document_id: str, page: int, limit: int = SEGMENTS_PAGE_LIMIT
+    ) -> dict[str, Any]:
+        response = self.get(
+            f"/datasets/{dataset_id}/documents/{document_id}/segments", params={"limit": limit, "page": page}
+        )
+        if response.status_code != 200:
+            raise Exception(f"{response.status_code} {response.text}")
+        return response.json()
+
+    def iter_segment_pages(
+        self,
+        dataset_id: str,
+        document_id: str,
+        max_workers: int = MAX_CONCURRENT_PAGES,
+        first_page: dict[str, Any] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield all pages of segments of a document, in order, as soon as each page and
+        the pages before it have arrived.
+
+        The first page tells the total number of segments, so the remaining pages are
+        fetched concurrently with at most max_workers requests in flight. If the API does
+        not report the total, or more segments were added while fetching, the remaining
+        pages are followed one by one using has_more. An already fetched first page
+        can be passed in to save a request.
+        """
+        if first_page is None:
+            first_page = self.get_segment_page(dataset_id, document_id, 1)
+        yield first_page
+        last_page = first_page
+        page = 1
+
+        total = first_page.get("total")
+        limit = first_page.get("limit") or SEGMENTS_PAGE_LIMIT
+        if first_page.get("has_more") and isinstance(total, int):
+            page_count = math.ceil(total / limit)
+            if page_count > 1:
+                with ThreadPoolExecutor(max_workers=min(max_workers, page_count - 1)) as executor:
+                    pages = executor.map(
+                        lambda number: self.get_segment_page(dataset_id, document_id, number, limit),
+                        range(2, page_count + 1),
+                    )
+                    # map() yields the results in page order regardless of completion order
+                    for last_page in pages:
+                        yield last_page
+                page = page_count
+
+        while last_page.get("has_more", False):
+            page += 1
+            last_page = self.get_segment_page(dataset_id, document_id, page, limit)
+            yield last_page
+
+    def get_document_contents(
+        self, dataset_id: str, document_id: str, max_workers: int = MAX_CONCURRENT_PAGES, use_cache: bool = False
+    ) -> list[str]:
+        """
+        Return the contents of all segments of a document, in order.
+
+        With use_cache, contents are cached per (api base url and key, dataset, document)
+        along with a version of the document taken from its first page of segments, so an
+        unchanged document costs a single request. The Knowledge API has no marker that
+        changes with every edit of a document, so edits that only touch segments beyond
+        the first page are missed until the entry expires; the cache is off by default.
+        """
+        first_page = self.get_segment_page(dataset_id, document_id, 1)
+        if not use_cache:
+            return list(self._iter_contents(dataset_id, document_id, max_workers, first_page))
+
+        cache_key = self._document_cache_key(dataset_id, document_id)
+        version = segment_page_version(first_page)
+        cached = _document_cache.get(cache_key)
+        if cached is not None and cached["version"] == version:
+            return cached["contents"]
+        contents = list(self._iter_contents(dataset_id, document_id, max_workers, first_page))
+        _document_cache.set(cache_key, {"version": version, "contents": contents})
+        return contents
+
+    def iter_document_contents(
+        self, dataset_id: str, document_id: str, max_workers: int = MAX_CONCURRENT_PAGES, use_cache: bool = False
+    ) -> Iterator[str]:
+        """
+        Return an iterator over the contents of all segments of a document, in order,
+        yielding them as pages arrive.
+
+        The first page is fetched before returning, so that a missing document fails here
+        rather than after part of the output has been sent. With use_cache, an unchanged
+        document cached by get_document_contents is served from the cache, but streamed
+        documents are not added to it, so that they are never held in memory as a whole.
+        """
+        first_page = self.get_segment_page(dataset_id, document_id, 1)
+        if use_cache:
+            cached = _document_cache.get(self._document_cache_key(dataset_id, document_id))
+            if cached is not None and cached["version"] == segment_page_version(first_page):
+                return iter(cached["contents"])
+        return self._iter_contents(dataset_id, document_id, max_workers, first_page)
+
+    def _document_cache_key(self, dataset_id: str, document_id: str) -> str:
+        return json.dumps([self.cache_scope, dataset_id, document_id])
+
+    def _iter_contents(
+        self, dataset_id: str, document_id: str, max_workers: int, first_page: dict[str, Any]
+    ) -> Iterator[str]:
+        for page in self.iter_segment_pages(dataset_id, document_id, max_workers, first_page):
+            for segment in page.get("data", []):
+                yield segment.get("content", "")
+
+    def get_documents_contents(
+        self,
+        dataset_id: str,
+        document_ids: list[str],
+        max_workers: int = MAX_CONCURRENT_DOCUMENTS,
+        use_cache: bool = False,
+    ) -> list[list[str] | Exception]:
+        """
+        Return the contents of all segments of many documents, in the input order.
+
+        Documents are fetched concurrently, each with up to MAX_CONCURRENT_PAGES_PER_DOCUMENT
+        pages in flight. A failed document is returned as its exception without affecting
+        the others.
+        """
+        page_workers = MAX_CONCURRENT_PAGES if len(document_ids) <= 1 else MAX_CONCURRENT_PAGES_PER_DOCUMENT
+
+        def fetch(document_id: str) -> list[str] | Exception:
+            try:
+                return self.get_document_contents(dataset_id, document_id, page_workers, use_cache)
+            except Exception as e:
+                return e
+
+        if len(document_ids) <= 1:
+            return [fetch(document_id) for document_id in document_ids]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(document_ids))) as executor:
+            return list(executor.map(fetch, document_ids))
+
+
+def segment_page_version(page: dict[str, Any]) -> str:
+    """
+    Return a version marker of a document from a page of its segments.
+
+    The marker changes when segments are added or removed, or when any segment on
+    the page is edited, enabled or disabled.
+    """
+    fields = ("id", "index_node_hash", "word_count", "enabled", "status", "updated_at")
+    marker = [page.get("total"), [[segment.get(field) for field in fields] for segment in page.get("data", [])]]
+    return hashlib.sha256(json.dumps(marker, sort_keys=True, default=str).encode("utf-8")).hexdigest()
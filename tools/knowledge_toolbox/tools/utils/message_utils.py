@@ -0,0 +1,60 @@
+import os
+import uuid
+from collections.abc import Iterable, Iterator
+from typing import IO
+
+from dify_plugin.entities.tool import ToolInvokeMessage
+
+BLOB_CHUNK_SIZE = 8192  # The largest blob chunk Dify accepts from plugins
+TEXT_CHUNK_CHARS = 65536
+
+
+def iter_blob_chunk_messages(file: IO[bytes], meta: dict) -> Iterator[ToolInvokeMessage]:
+    """
+    Send a file as a sequence of blob chunks, as create_blob_message would,
+    without reading the whole file into memory.
+    """
+    blob_id = uuid.uuid4().hex
+    total_length = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    sequence = 0
+    while chunk := file.read(BLOB_CHUNK_SIZE):
+        yield _create_blob_chunk_message(blob_id, sequence, total_length, chunk, False, meta)
+        sequence += 1
+    yield _create_blob_chunk_message(blob_id, sequence, total_length, b"", True, meta)
+
+
+def _create_blob_chunk_message(
+    blob_id: str, sequence: int, total_length: int, blob: bytes, end: bool, meta: dict
+) -> ToolInvokeMessage:
+    return ToolInvokeMessage(
+        type=ToolInvokeMessage.MessageType.BLOB_CHUNK,
+        message=ToolInvokeMessage.BlobChunkMessage(
+            id=blob_id, sequence=sequence, total_length=total_length, blob=blob, end=end
+        ),
+        meta=meta,
+    )
+
+
+def iter_joined_chunks(contents: Iterable[str], delimiter: str, chunk_chars: int = TEXT_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Join contents with a delimiter, yielding the result in chunks of chunk_chars characters
+    (the last one may be shorter) while contents are still being produced.
+    """
+    parts: list[str] = []
+    size = 0
+    for index, content in enumerate(contents):
+        if index:
+            parts.append(delimiter)
+            size += len(delimiter)
+        parts.append(content)
+        size += len(content)
+        if size >= chunk_chars:
+            text = "".join(parts)
+            end = len(text) - len(text) % chunk_chars
+            for start in range(0, end, chunk_chars):
+                yield text[start : start + chunk_chars]
+            parts = [text[end:]]
+            size = len(parts[0])
+    if size:
+        yield "".join(parts)
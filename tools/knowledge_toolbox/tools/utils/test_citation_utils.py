@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from tools.utils.citation_utils import index_documents, parse_context
+
+CITATIONS = [
+    {"content": "a", "metadata": {"dataset_id": "dataset", "document_id": "document-1", "score": 0.9}},
+    {"content": "b", "metadata": {"dataset_id": "dataset", "document_id": "document-2", "score": None}},
+]
+
+
+def test_parse_context_reads_json():
+    assert parse_context(json.dumps(CITATIONS)) == CITATIONS
+
+
+def test_parse_context_falls_back_to_python_literal():
+    # a Template node renders Array[Object] with single quotes and None
+    assert parse_context(str(CITATIONS)) == CITATIONS
+
+
+@pytest.mark.parametrize("context", ["", "not a context", "[{'content': 'a'", '{"content": "a"}', "[1, 2]"])
+def test_parse_context_rejects_malformed_input(context):
+    with pytest.raises((ValueError, SyntaxError)):
+        parse_context(context)
+
+
+def test_index_documents_deduplicates_in_order_of_appearance():
+    context = [
+        {"metadata": {"dataset_id": "dataset", "document_id": "document-2"}},
+        {"metadata": {"dataset_id": "dataset", "document_id": "document-1"}},
+        {"metadata": {"dataset_id": "dataset", "document_id": "document-2"}},
+        # the same document id in another dataset is another document
+        {"metadata": {"dataset_id": "other", "document_id": "document-1"}},
+    ]
+    documents = index_documents(context)
+    assert list(documents) == [("dataset", "document-2"), ("dataset", "document-1"), ("other", "document-1")]
+    assert documents[("other", "document-1")] == {"dataset_id": "other", "document_id": "document-1"}
+
+
+def test_index_documents_without_metadata():
+    assert list(index_documents([{"content": "a"}, {"content": "b"}])) == [(None, None)]
@@ -0,0 +1,213 @@
+import dify_plugin  # noqa: F401  # Patches the standard library with gevent first, as in the plugin runtime
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from tools.utils.knowledge_api import DownloadTooLargeError, KnowledgeAPIClient
+
+
+class SegmentsHandler(BaseHTTPRequestHandler):
+    total = 250
+    report_total = True
+    failures = 0
+    requested_pages: list[int] = []
+    upload_file_requests = 0
+
+    def do_GET(self):
+        if SegmentsHandler.failures:
+            SegmentsHandler.failures -= 1
+            self.send_response(503)
+            self.send_header("retry-after", "3600")
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+        path = urlparse(self.path).path
+        if path.startswith("/files/"):
+            # "/files/<size>" serves <size> bytes of text, "/files/<size>/unsized" without Content-Length
+            _, _, size, *unsized = path.split("/")
+            payload = ("あいう" * int(size)).encode()[: int(size)]
+            self.send_response(200)
+            if not unsized:
+                self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if path.endswith("/documents"):
+            page = int(parse_qs(urlparse(self.path).query)["page"][0])
+            documents = [{"id": f"document-{index}", "name": f"Document {index}"} for index in range(150)]
+            self._send_json(200, {"data": documents[(page - 1) * 100 : page * 100], "has_more": page == 1})
+            return
+        if path.endswith("/documents/missing/segments"):
+            self._send_json(404, {"message": "Document not found"})
+            return
+        if path.endswith("/upload-file"):
+            document_id = path.split("/")[-2]
+            SegmentsHandler.upload_file_requests += 1
+            self._send_json(404 if document_id == "missing" else 200, {"name": document_id})
+            return
+        query = parse_qs(urlparse(self.path).query)
+        page, limit = int(query["page"][0]), int(query["limit"][0])
+        self.requested_pages.append(page)
+        time.sleep(random.uniform(0, 0.02))  # let pages complete out of order
+        start = (page - 1) * limit
+        body = {
+            "data": [{"content": f"segment {index}"} for index in range(start, min(start + limit, self.total))],
+            "has_more": start + limit < self.total,
+            "limit": limit,
+            "page": page,
+        }
+        if self.report_total:
+            body["total"] = self.total
+        self._send_json(200, body)
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def segments_server():
+    SegmentsHandler.requested_pages = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SegmentsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield KnowledgeAPIClient(f"http://127.0.0.1:{server.server_port}", "key")
+    server.shutdown()
+    server.server_close()
+    SegmentsHandler.report_total = True
+
+
+def all_segments(client: KnowledgeAPIClient) -> list[dict]:
+    return [segment for page in client.iter_segment_pages("dataset", "document") for segment in page["data"]]
+
+
+def test_fetch_all_segments_keeps_page_order(segments_server):
+    segments = all_segments(segments_server)
+    assert [segment["content"] for segment in segments] == [f"segment {index}" for index in range(250)]
+    assert sorted(SegmentsHandler.requested_pages) == [1, 2, 3]
+
+
+def test_fetch_all_segments_follows_has_more_without_total(segments_server):
+    SegmentsHandler.report_total = False
+    segments = all_segments(segments_server)
+    assert len(segments) == 250
+    assert SegmentsHandler.requested_pages == [1, 2, 3]
+
+
+def test_get_retries_transient_errors_without_waiting_for_retry_after(segments_server, monkeypatch):
+    monkeypatch.setattr(segments_server.session.get_adapter("http://").max_retries, "backoff_factor", 0)
+    SegmentsHandler.total = 10
+    SegmentsHandler.failures = 2
+    try:
+        started = time.monotonic()
+        assert len(all_segments(segments_server)) == 10
+        assert time.monotonic() - started < 10
+    finally:
+        SegmentsHandler.total = 250
+    assert SegmentsHandler.failures == 0
+
+
+def test_get_upload_files_isolates_failures(segments_server):
+    documents = [("dataset", "a"), ("dataset", "missing"), ("dataset", "b")]
+    results = segments_server.get_upload_files(documents)
+    assert results == [{"name": "a"}, None, {"name": "b"}]
+
+
+def test_get_upload_file_caches_successful_lookups(segments_server):
+    SegmentsHandler.upload_file_requests = 0
+    assert segments_server.get_upload_files([("dataset", "a"), ("dataset", "missing")]) == [{"name": "a"}, None]
+    assert segments_server.get_upload_files([("dataset", "a"), ("dataset", "missing")]) == [{"name": "a"}, None]
+    # failures are not cached
+    assert SegmentsHandler.upload_file_requests == 3
+
+    other_key = KnowledgeAPIClient(segments_server.api_base_url, "other key")
+    assert other_key.get_upload_file("dataset", "a") == {"name": "a"}
+    assert SegmentsHandler.upload_file_requests == 4
+
+
+@pytest.mark.parametrize("path", ["/files/30000", "/files/30000/unsized"])
+def test_download_to_file_enforces_size_limit(segments_server, path):
+    url = segments_server.api_base_url + path
+    with segments_server.download_to_file(url, max_bytes=30000) as file:
+        assert len(file.read()) == 30000
+    with pytest.raises(DownloadTooLargeError):
+        segments_server.download_to_file(url, max_bytes=29999)
+
+
+def test_download_text_decodes_across_chunks_and_truncates(segments_server):
+    url = segments_server.api_base_url + "/files/30000"
+    assert segments_server.download_text(url) == ("あいう" * 3333 + "あ", False)
+    assert segments_server.download_text(url, max_bytes=100, max_chars=5) == ("あいうあい", True)
+    # content of exactly max_chars characters is complete
+    assert segments_server.download_text(url, max_chars=10000) == ("あいう" * 3333 + "あ", False)
+    with pytest.raises(UnicodeDecodeError):
+        segments_server.download_text(segments_server.api_base_url + "/files/29999")
+
+
+def test_get_document_contents_does_not_cache_by_default(segments_server):
+    assert len(segments_server.get_document_contents("dataset", "document")) == 250
+    SegmentsHandler.requested_pages = []
+    assert len(segments_server.get_document_contents("dataset", "document")) == 250
+    assert sorted(SegmentsHandler.requested_pages) == [1, 2, 3]
+
+
+def test_get_document_contents_revalidates_with_first_page(segments_server):
+    assert len(segments_server.get_document_contents("dataset", "document", use_cache=True)) == 250
+    assert sorted(SegmentsHandler.requested_pages) == [1, 2, 3]
+
+    # unchanged documents are served from the cache
+    SegmentsHandler.requested_pages = []
+    assert len(segments_server.get_document_contents("dataset", "document", use_cache=True)) == 250
+    assert SegmentsHandler.requested_pages == [1]
+
+    SegmentsHandler.requested_pages = []
+    SegmentsHandler.total = 260
+    try:
+        assert len(segments_server.get_document_contents("dataset", "document", use_cache=True)) == 260
+    finally:
+        SegmentsHandler.total = 250
+    assert sorted(SegmentsHandler.requested_pages) == [1, 2, 3]
+
+
+def test_iter_document_contents_fetches_first_page_eagerly(segments_server):
+    with pytest.raises(Exception, match="404"):
+        segments_server.iter_document_contents("dataset", "missing")
+    contents = segments_server.iter_document_contents("dataset", "document")
+    assert SegmentsHandler.requested_pages == [1]
+    assert len(list(contents)) == 250
+
+
+def test_iter_document_contents_reads_but_does_not_populate_cache(segments_server):
+    assert len(list(segments_server.iter_document_contents("dataset", "document", use_cache=True))) == 250
+    SegmentsHandler.requested_pages = []
+    assert len(list(segments_server.iter_document_contents("dataset", "document", use_cache=True))) == 250
+    assert sorted(SegmentsHandler.requested_pages) == [1, 2, 3]
+
+    segments_server.get_document_contents("dataset", "document", use_cache=True)
+    SegmentsHandler.requested_pages = []
+    assert len(list(segments_server.iter_document_contents("dataset", "document", use_cache=True))) == 250
+    assert SegmentsHandler.requested_pages == [1]
+
+
+def test_list_documents_follows_pages(segments_server):
+    documents = segments_server.list_documents("dataset")
+    assert [document["id"] for document in documents] == [f"document-{index}" for index in range(150)]
+
+
+def test_get_documents_contents_isolates_failures(segments_server):
+    results = segments_server.get_documents_contents("dataset", ["document-1", "missing", "document-2"])
+    assert len(results[0]) == 250 and len(results[2]) == 250
+    assert isinstance(results[1], Exception)
@@ -0,0 +1,18 @@
+import io
+
+from tools.utils.message_utils import iter_blob_chunk_messages, iter_joined_chunks
+
+
+def test_iter_joined_chunks_bounds_chunk_size():
+    contents = ["a" * 5, "b" * 12, "", "c"]
+    chunks = list(iter_joined_chunks(iter(contents), "--", chunk_chars=4))
+    assert "".join(chunks) == "--".join(contents)
+    assert all(len(chunk) == 4 for chunk in chunks[:-1]) and 0 < len(chunks[-1]) <= 4
+    assert list(iter_joined_chunks([], "--")) == []
+
+
+def test_iter_blob_chunk_messages_ends_with_empty_chunk():
+    messages = list(iter_blob_chunk_messages(io.BytesIO(b"x" * 20000), {"filename": "a.md"}))
+    assert [message.message.sequence for message in messages] == [0, 1, 2, 3]
+    assert [len(message.message.blob) for message in messages] == [8192, 8192, 3616, 0]
+    assert messages[-1].message.end and messages[0].message.total_length == 20000
@@ -0,0 +1,21 @@
+from tools.utils.ttl_cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("tools.utils.ttl_cache.time.time", lambda: now[0])
+    cache = TTLCache(ttl_sec=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    now[0] += 60
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_shares_entries_through_directory(tmp_path):
+    TTLCache(ttl_sec=60, max_entries=2, directory=str(tmp_path)).set("key", {"download_url": "url"})
+    assert TTLCache(ttl_sec=60, max_entries=2, directory=str(tmp_path)).get("key") == {"download_url": "url"}
+    assert TTLCache(ttl_sec=60, max_entries=2, directory=str(tmp_path)).get("other") is None
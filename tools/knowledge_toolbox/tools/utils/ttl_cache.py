@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after a fixed time.
+
+    With a directory, entries are also written there as JSON files, so that plugin
+    processes sharing the directory can reuse each other's entries. Values must be
+    JSON serializable in that case.
+    """
+
+    def __init__(self, ttl_sec: float, max_entries: int, directory: str | None = None):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as cache_file:
+                stored = json.load(cache_file)
+            expires_at = float(stored["expires_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if expires_at <= now:
+            return None
+        self._remember(key, expires_at, stored["value"])
+        return stored["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_sec
+        self._remember(key, expires_at, value)
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump({"expires_at": expires_at, "value": value}, tmp_file, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+            self._prune_expired()
+        except (OSError, TypeError, ValueError):
+            # the shared backend is best effort; the in-process entry is still used
+            return
+
+    def clear(self) -> None:
+        """
+        Drop all in-process entries. Entries in the directory are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _prune_expired(self) -> None:
+        names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        if len(names) <= self.max_entries:
+            return
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "r", encoding="utf-8") as cache_file:
+                    if float(json.load(cache_file)["expires_at"]) > now:
+                        continue
+                os.remove(path)
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
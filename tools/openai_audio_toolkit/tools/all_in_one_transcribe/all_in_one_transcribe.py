@@ -26,6 +26,7 @@ class AllInOneTranscribeTool(Tool):
 
             auto_split = tool_parameters.get("auto_split", True)
             use_silence_detection = tool_parameters.get("use_silence_detection", False)
+            trim_silence = tool_parameters.get("trim_silence", False)
             output_format = tool_parameters.get("output_format") or "plain_text"
 
             credentials = self.runtime.credentials
@@ -43,10 +44,11 @@ class AllInOneTranscribeTool(Tool):
             logger.info("Tool invoked: all_in_one_transcribe")
             logger.info("Starting transcription with %s", service.replace("_", " ").title())
             logger.info(
-                "Processing %s file(s) with auto-split %s, silence detection %s",
+                "Processing %s file(s) with auto-split %s, silence detection %s, silence trimming %s",
                 len(input_files),
                 "enabled" if auto_split else "disabled",
                 "enabled" if use_silence_detection else "disabled",
+                "enabled" if trim_silence else "disabled",
             )
 
             client = create_openai_client(service, api_key, base_url)
@@ -57,6 +59,7 @@ class AllInOneTranscribeTool(Tool):
                 auto_split=auto_split,
                 use_silence_detection=use_silence_detection,
                 logger=logger,
+                trim_silence=trim_silence,
             )
 
             if not text:
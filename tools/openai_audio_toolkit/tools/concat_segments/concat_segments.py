@@ -8,7 +8,7 @@ from dify_plugin.config.logger_format import plugin_logger_handler
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
-from tools.utils.segment_utils import concat_segments_items, normalize_concat_items
+from tools.utils.segment_utils import concat_segments_items, interleave_segments_items, normalize_concat_items
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +23,7 @@ class ConcatSegmentsTool(Tool):
 
             items_array = tool_parameters.get("items_array")
             items_json_string = tool_parameters.get("items_json_string")
+            mode = tool_parameters.get("mode") or "sequential"
 
             if items_array and items_json_string:
                 raise ToolProviderCredentialValidationError("Provide only one of items_array or items_json_string")
@@ -30,6 +31,9 @@ class ConcatSegmentsTool(Tool):
             if items_array is None and not items_json_string:
                 raise ToolProviderCredentialValidationError("items_array or items_json_string is required")
 
+            if mode not in {"sequential", "interleave"}:
+                raise ToolProviderCredentialValidationError("mode must be one of sequential, interleave")
+
             try:
                 items = normalize_concat_items(items_array if items_array is not None else items_json_string)
             except ValueError as exc:
@@ -39,7 +43,11 @@ class ConcatSegmentsTool(Tool):
                 segments = item.get("segments", [])
                 logger.info("Item %s: %s segment(s)", item_index, len(segments))
 
-            payload = concat_segments_items(items)
+            logger.info("Merging %s item(s) in %s mode", len(items), mode)
+            if mode == "interleave":
+                payload = interleave_segments_items(items)
+            else:
+                payload = concat_segments_items(items)
 
             logger.info("Yielding diarization result (text)")
             yield self.create_text_message(json.dumps(payload, ensure_ascii=False))
@@ -8,7 +8,7 @@ from dify_plugin.config.logger_format import plugin_logger_handler
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
-from tools.utils.transcribe_utils import create_openai_client, diarize_audio_files
+from tools.utils.transcribe_utils import create_diarization_checkpoint, create_openai_client, diarize_audio_files
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +25,8 @@ class DiarizeAudioTool(Tool):
             if not self.runtime or not self.runtime.credentials:
                 raise ToolProviderCredentialValidationError("Tool runtime or credentials are missing")
 
+            use_checkpoint = tool_parameters.get("use_checkpoint", False)
+
             credentials = self.runtime.credentials
             api_key = credentials.get("api_key")
             service = credentials.get("service")
@@ -39,10 +41,17 @@ class DiarizeAudioTool(Tool):
 
             logger.info("Tool invoked: diarize_audio")
             logger.info("Starting transcription with %s", service.replace("_", " ").title())
-            logger.info("Processing %s file(s)", len(input_files))
+            logger.info(
+                "Processing %s file(s) with checkpoint %s",
+                len(input_files),
+                "enabled" if use_checkpoint else "disabled",
+            )
 
             client = create_openai_client(service, api_key, base_url)
-            all_segments, offset_end = diarize_audio_files(client, model, input_files, logger)
+            checkpoint = (
+                create_diarization_checkpoint(client, model, input_files, {}, logger=logger) if use_checkpoint else None
+            )
+            all_segments, offset_end = diarize_audio_files(client, model, input_files, logger, checkpoint=checkpoint)
 
             if not all_segments:
                 raise ToolProviderCredentialValidationError("No transcription segments were produced")
@@ -0,0 +1,128 @@
+from collections.abc import Generator
+from typing import Any
+import logging
+import json
+
+from dify_plugin import Tool
+from dify_plugin.config.logger_format import plugin_logger_handler
+from dify_plugin.entities.tool import ToolInvokeMessage
+from dify_plugin.errors.tool import ToolProviderCredentialValidationError
+
+from tools.utils.segment_utils import (
+    format_segments_payload,
+    parse_segments_payload,
+    parse_time_value,
+    slice_segments_payload,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(plugin_logger_handler)
+
+
+def _parse_segments_payload(tool_parameters: dict[str, Any]) -> dict[str, Any]:
+    segments_json_string = tool_parameters.get("segments_json_string")
+    segments_json_file = tool_parameters.get("segments_json_file")
+
+    try:
+        return parse_segments_payload(segments_json_string, segments_json_file)
+    except ValueError as exc:
+        raise ToolProviderCredentialValidationError(str(exc))
+
+
+def _parse_optional_time(tool_parameters: dict[str, Any], name: str) -> float | None:
+    value = tool_parameters.get(name)
+    if value is None or str(value).strip() == "":
+        return None
+
+    try:
+        return parse_time_value(value)
+    except ValueError as exc:
+        raise ToolProviderCredentialValidationError(f"{name}: {str(exc)}")
+
+
+def _resolve_time_window(tool_parameters: dict[str, Any]) -> tuple[float | None, float | None]:
+    start_sec = _parse_optional_time(tool_parameters, "start_time")
+    end_sec = _parse_optional_time(tool_parameters, "end_time")
+    at_sec = _parse_optional_time(tool_parameters, "at_time")
+    padding_sec = _parse_optional_time(tool_parameters, "padding_sec") or 0.0
+
+    if at_sec is not None:
+        if start_sec is not None or end_sec is not None:
+            raise ToolProviderCredentialValidationError("Provide either at_time or start_time/end_time, not both")
+        return max(at_sec - padding_sec, 0.0), at_sec + padding_sec
+
+    if start_sec is None and end_sec is None:
+        raise ToolProviderCredentialValidationError("at_time, start_time, or end_time is required")
+
+    if start_sec is not None:
+        start_sec = max(start_sec - padding_sec, 0.0)
+    if end_sec is not None:
+        end_sec = end_sec + padding_sec
+    if start_sec is not None and end_sec is not None and end_sec < start_sec:
+        raise ToolProviderCredentialValidationError("end_time must not be earlier than start_time")
+
+    return start_sec, end_sec
+
+
+class SliceSegmentsTool(Tool):
+    def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
+        try:
+            logger.info("Tool invoked: slice_segments")
+
+            output_format = tool_parameters.get("output_format") or "plain_text"
+            start_sec, end_sec = _resolve_time_window(tool_parameters)
+
+            payload = _parse_segments_payload(tool_parameters)
+            try:
+                payload = slice_segments_payload(payload, start_sec, end_sec)
+            except ValueError as exc:
+                raise ToolProviderCredentialValidationError(str(exc))
+
+            metadata = payload["metadata"]
+            logger.info(
+                "Sliced %s segment(s) between %.1fs and %.1fs",
+                metadata["segment_count"],
+                metadata["slice_start_sec"],
+                metadata["slice_end_sec"],
+            )
+
+            if output_format in {"json_text", "json_file"}:
+                json_text = json.dumps(payload, ensure_ascii=False)
+                if output_format == "json_file":
+                    logger.info("Yielding sliced JSON file")
+                    yield self.create_blob_message(
+                        (json_text + "\n").encode("utf-8"),
+                        meta={
+                            "filename": "segments.json",
+                            "mime_type": "application/json",
+                        },
+                    )
+                else:
+                    logger.info("Yielding sliced JSON text")
+                    yield self.create_text_message(json_text)
+            else:
+                formatted, mime_type, file_extension = format_segments_payload(payload, output_format)
+                if output_format.endswith("_file"):
+                    filename = f"transcript.{file_extension}"
+                    logger.info("Yielding sliced file")
+                    yield self.create_blob_message(
+                        formatted.encode("utf-8"),
+                        meta={
+                            "filename": filename,
+                            "mime_type": mime_type,
+                        },
+                    )
+                else:
+                    logger.info("Yielding sliced text")
+                    yield self.create_text_message(formatted)
+
+        except ToolProviderCredentialValidationError as e:
+            error_msg = f"Error: {str(e)}"
+            yield self.create_text_message(error_msg)
+            raise
+        except Exception as e:
+            error_msg = f"Unexpected error: {str(e)}"
+            yield self.create_text_message(error_msg)
+            raise ToolProviderCredentialValidationError(error_msg)
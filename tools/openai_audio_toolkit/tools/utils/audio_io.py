@@ -13,7 +13,8 @@ from dify_plugin.file.file import File
 from pydub import AudioSegment
 
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
-from tools.utils.audio_split import split_audio_on_silence
+from tools.utils.audio_split import split_audio_on_silence, trim_audio_silence
+from tools.utils.time_utils import remap_trimmed_time, slice_time_map
 
 
 @dataclass(frozen=True)
@@ -21,6 +22,9 @@ class AudioPayload:
     filename: str
     data: bytes
     mime_type: str
+    # Set when silence was trimmed: (trimmed_start_sec, original_start_sec) anchors and original span
+    time_map: tuple[tuple[float, float], ...] | None = None
+    original_duration_sec: float | None = None
 
 
 # API limits
@@ -125,11 +129,18 @@ def calculate_file_size_mb(data: bytes) -> float:
     return len(data) / (1024 * 1024)
 
 
-def _build_payload(filename: str, data: bytes) -> AudioPayload:
+def _build_payload(
+    filename: str,
+    data: bytes,
+    time_map: list[tuple[float, float]] | None = None,
+    original_duration_sec: float | None = None,
+) -> AudioPayload:
     return AudioPayload(
         filename=filename,
         data=data,
         mime_type=get_mime_type(filename),
+        time_map=tuple(time_map) if time_map else None,
+        original_duration_sec=original_duration_sec,
     )
 
 
@@ -264,12 +275,117 @@ def extract_audio_from_mp4_copy(data: bytes, output_extension: str, logger=None)
         raise ToolProviderCredentialValidationError("Failed to extract audio stream from MP4")
 
 
+def probe_audio_channels(data: bytes, extension: str, logger=None) -> int | None:
+    try:
+        with tempfile.NamedTemporaryFile(suffix=f".{extension}") as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            result = subprocess.run(
+                [
+                    "ffprobe",
+                    "-v",
+                    "error",
+                    "-select_streams",
+                    "a:0",
+                    "-show_entries",
+                    "stream=channels",
+                    "-of",
+                    "json",
+                    tmp_file.name,
+                ],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+
+        if result.returncode != 0:
+            if logger:
+                logger.info("FFprobe failed: %s", (result.stderr or result.stdout).strip())
+            return None
+
+        streams = json.loads(result.stdout).get("streams", [])
+        if not streams:
+            return None
+        return int(streams[0].get("channels"))
+    except Exception as exc:
+        if logger:
+            logger.info("FFprobe error: %s", exc)
+        return None
+
+
+def split_stereo_channels(data: bytes, filename: str, logger=None) -> list[AudioPayload]:
+    """
+    Split a stereo audio/video file into left and right mono files in a single FFmpeg run.
+    Channels are split and compressed by FFmpeg directly; no PCM is decoded into Python.
+
+    Returns:
+        Payloads for the left and right channels, in this order
+    """
+    extension = get_file_extension(filename) or "bin"
+    base_filename = filename.rsplit(".", 1)[0]
+    compress_parameters = ["-c:a", "aac", "-ac", "1", "-ar", "16000", "-b:a", "64k", "-f", "ipod"]
+    try:
+        with tempfile.NamedTemporaryFile(suffix=f".{extension}") as tmp_input, tempfile.NamedTemporaryFile(
+            suffix=".m4a"
+        ) as tmp_left, tempfile.NamedTemporaryFile(suffix=".m4a") as tmp_right:
+            tmp_input.write(data)
+            tmp_input.flush()
+
+            result = subprocess.run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    tmp_input.name,
+                    "-filter_complex",
+                    "[0:a:0]channelsplit=channel_layout=stereo[left][right]",
+                    "-map",
+                    "[left]",
+                    *compress_parameters,
+                    tmp_left.name,
+                    "-map",
+                    "[right]",
+                    *compress_parameters,
+                    tmp_right.name,
+                ],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+
+            if result.returncode != 0:
+                if logger:
+                    logger.info("FFmpeg channel split failed: %s", (result.stderr or result.stdout).strip())
+                raise ToolProviderCredentialValidationError("Failed to split audio channels")
+
+            tmp_left.seek(0)
+            tmp_right.seek(0)
+            return [
+                _build_payload(f"{base_filename}_left.m4a", tmp_left.read()),
+                _build_payload(f"{base_filename}_right.m4a", tmp_right.read()),
+            ]
+    except ToolProviderCredentialValidationError:
+        raise
+    except Exception as exc:
+        if logger:
+            logger.info("FFmpeg channel split error: %s", exc)
+        raise ToolProviderCredentialValidationError("Failed to split audio channels")
+
+
 def split_audio_file(
     audio: AudioSegment,
     filename: str,
     use_silence_detection: bool,
     logger,
+    time_map: list[tuple[float, float]] | None = None,
+    source_duration_sec: float | None = None,
 ) -> list[AudioPayload]:
+    """
+    Compress audio into API-ready payloads, splitting it if it exceeds the API limits.
+
+    If time_map is given, the audio is silence-trimmed and source_duration_sec is the duration of the
+    untrimmed recording; each payload then carries its own chunk-relative time map and original span.
+    """
     original_duration_sec = audio.duration_seconds
     estimated_size_mb = estimate_compressed_size_mb(original_duration_sec)
     if logger:
@@ -290,6 +406,8 @@ def split_audio_file(
             _build_payload(
                 compressed_filename,
                 compressed_audio,
+                time_map=time_map,
+                original_duration_sec=source_duration_sec if time_map else None,
             )
         ]
 
@@ -305,22 +423,57 @@ def split_audio_file(
     if logger:
         logger.info("Created %s chunk(s)", len(audio_chunks))
 
+    chunk_spans: list[tuple[list[tuple[float, float]] | None, float | None]] = [(None, None)] * len(audio_chunks)
+    if time_map:
+        # Chunks are contiguous, so their boundaries on the trimmed audio are cumulative lengths
+        boundaries = [0.0]
+        for chunk in audio_chunks:
+            boundaries.append(boundaries[-1] + chunk.duration_seconds)
+        original_starts = [0.0] + [remap_trimmed_time(boundary, time_map) for boundary in boundaries[1:-1]]
+        original_starts.append(source_duration_sec)
+        chunk_spans = [
+            (
+                slice_time_map(time_map, boundaries[idx], boundaries[idx + 1], original_starts[idx]),
+                original_starts[idx + 1] - original_starts[idx],
+            )
+            for idx in range(len(audio_chunks))
+        ]
+
     result: list[AudioPayload] = []
     base_filename = filename.rsplit(".", 1)[0]
-    for chunk_idx, chunk in enumerate(audio_chunks, 1):
+    for chunk_idx, (chunk, (chunk_map, chunk_duration_sec)) in enumerate(zip(audio_chunks, chunk_spans), 1):
         logger.info("Compressing chunk %s/%s", chunk_idx, len(audio_chunks))
         compressed_chunk = export_compressed_audio(chunk)
         chunk_filename = f"{base_filename}_chunk{chunk_idx:03d}.m4a"
-        result.append(_build_payload(chunk_filename, compressed_chunk))
+        result.append(
+            _build_payload(
+                chunk_filename,
+                compressed_chunk,
+                time_map=chunk_map,
+                original_duration_sec=chunk_duration_sec,
+            )
+        )
 
     return result
 
 
+def _trim_silence(audio: AudioSegment, logger=None) -> tuple[AudioSegment, list[tuple[float, float]] | None]:
+    """
+    Trim long silences from audio and return it with its (trimmed_start_sec, original_start_sec) map,
+    or the audio unchanged and None if nothing was trimmed.
+    """
+    trimmed_audio, trim_map_ms = trim_audio_silence(audio, logger=logger)
+    if trim_map_ms is None:
+        return audio, None
+    return trimmed_audio, [(trimmed_ms / 1000.0, original_ms / 1000.0) for trimmed_ms, original_ms in trim_map_ms]
+
+
 def _split_audio_items(
     items: list[tuple[str, bytes]],
     use_silence_detection: bool,
     logger=None,
     item_label: str = "Item",
+    trim_silence: bool = False,
 ) -> list[AudioPayload]:
     output_files: list[AudioPayload] = []
     for item_index, (filename, data) in enumerate(items, start=1):
@@ -333,13 +486,33 @@ def _split_audio_items(
                 logger.info("%s %s: unsupported audio format, skipped", item_label, item_index)
             continue
 
+        audio = None
+        if trim_silence:
+            if logger:
+                logger.info("%s %s: trimming silence", item_label, item_index)
+            audio = load_audio_from_bytes(data, extension)
+            trimmed_audio, time_map = _trim_silence(audio, logger=logger)
+            if time_map is not None:
+                output_files.extend(
+                    split_audio_file(
+                        trimmed_audio,
+                        filename,
+                        use_silence_detection,
+                        logger,
+                        time_map=time_map,
+                        source_duration_sec=audio.duration_seconds,
+                    )
+                )
+                continue
+
         file_size_mb = calculate_file_size_mb(data)
         if extension.lower() == "mp4":
             is_audio_only_supported, duration_sec, has_video, codec_name = probe_mp4_streams(data, logger=logger)
             if duration_sec is not None and is_duration_exceeding_limit(duration_sec):
                 if logger:
                     logger.info("%s %s: duration exceeds limit; splitting", item_label, item_index)
-                audio = load_audio_from_bytes(data, extension)
+                if audio is None:
+                    audio = load_audio_from_bytes(data, extension)
                 output_files.extend(split_audio_file(audio, filename, use_silence_detection, logger))
                 continue
             if (
@@ -365,7 +538,8 @@ def _split_audio_items(
                         output_files.append(_build_payload(output_filename, extracted))
                         continue
 
-        audio = load_audio_from_bytes(data, extension)
+        if audio is None:
+            audio = load_audio_from_bytes(data, extension)
         if is_duration_exceeding_limit(audio.duration_seconds):
             if logger:
                 logger.info("%s %s: duration exceeds limit; splitting", item_label, item_index)
@@ -387,16 +561,39 @@ def split_audio_files(
     input_files: File | list[File],
     use_silence_detection: bool = False,
     logger=None,
+    trim_silence: bool = False,
 ) -> list[AudioPayload]:
     normalized_files = input_files if isinstance(input_files, list) else [input_files]
     items = [(file_item.filename, file_item.blob) for file_item in normalized_files]
-    return _split_audio_items(items, use_silence_detection, logger=logger, item_label="File")
+    return _split_audio_items(
+        items,
+        use_silence_detection,
+        logger=logger,
+        item_label="File",
+        trim_silence=trim_silence,
+    )
+
+
+def split_audio_payloads(
+    payloads: list[AudioPayload],
+    use_silence_detection: bool = False,
+    logger=None,
+) -> list[AudioPayload]:
+    items = [(payload.filename, payload.data) for payload in payloads]
+    return _split_audio_items(items, use_silence_detection, logger=logger, item_label="Payload")
 
 
 def files_to_payloads(
     input_files: File | list[File],
     logger=None,
+    trim_silence: bool = False,
 ) -> list[AudioPayload]:
+    """
+    Wrap files as payloads without splitting them.
+
+    With trim_silence, files with long silences are trimmed and compressed, carrying a time map
+    back to the original recording; other files are passed through as is.
+    """
     normalized_files = input_files if isinstance(input_files, list) else [input_files]
     payloads: list[AudioPayload] = []
     for file_index, file_item in enumerate(normalized_files, start=1):
@@ -408,5 +605,20 @@ def files_to_payloads(
             if logger:
                 logger.info("File %s: unsupported format, skipped", file_index)
             continue
+        if trim_silence:
+            if logger:
+                logger.info("File %s: trimming silence", file_index)
+            audio = load_audio_from_bytes(file_item.blob, extension)
+            trimmed_audio, time_map = _trim_silence(audio, logger=logger)
+            if time_map is not None:
+                payloads.append(
+                    _build_payload(
+                        f"{filename.rsplit('.', 1)[0]}.m4a",
+                        export_compressed_audio(trimmed_audio),
+                        time_map=time_map,
+                        original_duration_sec=audio.duration_seconds,
+                    )
+                )
+                continue
         payloads.append(_build_payload(filename, file_item.blob))
     return payloads
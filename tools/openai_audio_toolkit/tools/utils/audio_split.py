@@ -8,6 +8,7 @@ from pydub.silence import detect_silence
 DEFAULT_SILENCE_THRESH_DB = -40
 DEFAULT_MIN_SILENCE_LEN_MS = 1000
 DEFAULT_MIN_CHUNK_LEN_MS = 30000
+DEFAULT_KEEP_SILENCE_MS = 300
 
 
 def split_audio_on_silence(
@@ -102,3 +103,58 @@ def split_audio_by_duration(audio: AudioSegment, max_duration_ms: int) -> list[A
         end_ms = min(start_ms + max_duration_ms, duration_ms)
         chunks.append(audio[start_ms:end_ms])
     return chunks
+
+
+def trim_audio_silence(
+    audio: AudioSegment,
+    silence_thresh: int = DEFAULT_SILENCE_THRESH_DB,
+    min_silence_len: int = DEFAULT_MIN_SILENCE_LEN_MS,
+    keep_silence: int = DEFAULT_KEEP_SILENCE_MS,
+    logger=None,
+) -> tuple[AudioSegment, list[tuple[int, int]] | None]:
+    """
+    Remove silences longer than min_silence_len, keeping keep_silence ms at each edge.
+
+    Returns the trimmed audio and a time map of (trimmed_start_ms, original_start_ms) anchors,
+    one per kept region, or None if nothing was trimmed.
+    """
+    duration_ms = len(audio)
+    silence_ranges = detect_silence(
+        audio,
+        min_silence_len=min_silence_len,
+        silence_thresh=silence_thresh,
+    )
+
+    kept_ranges: list[tuple[int, int]] = []
+    region_start_ms = 0
+    for silence_start, silence_end in silence_ranges:
+        cut_start = silence_start + keep_silence if silence_start > 0 else 0
+        cut_end = silence_end - keep_silence if silence_end < duration_ms else duration_ms
+        if cut_end <= cut_start:
+            continue
+        if cut_start > region_start_ms:
+            kept_ranges.append((region_start_ms, cut_start))
+        region_start_ms = cut_end
+    if region_start_ms < duration_ms:
+        kept_ranges.append((region_start_ms, duration_ms))
+
+    if not kept_ranges or kept_ranges == [(0, duration_ms)]:
+        if logger:
+            logger.info("No silence to trim")
+        return audio, None
+
+    time_map: list[tuple[int, int]] = []
+    trimmed_ms = 0
+    for start_ms, end_ms in kept_ranges:
+        time_map.append((trimmed_ms, start_ms))
+        trimmed_ms += end_ms - start_ms
+
+    trimmed = audio._spawn(b"".join(audio[start_ms:end_ms].raw_data for start_ms, end_ms in kept_ranges))
+    if logger:
+        logger.info(
+            "Trimmed silence: %sms -> %sms (%s region(s) kept)",
+            duration_ms,
+            len(trimmed),
+            len(kept_ranges),
+        )
+    return trimmed, time_map
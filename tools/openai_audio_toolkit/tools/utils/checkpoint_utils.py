@@ -0,0 +1,181 @@
+"""
+Checkpoint utilities for resumable multi-chunk diarization
+"""
+
+from typing import Any
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from tools.utils.audio_io import AudioPayload
+
+CHECKPOINT_ROOT_DIR = os.path.join(tempfile.gettempdir(), "openai_audio_toolkit", "checkpoints")
+CHECKPOINT_MAX_AGE_SEC = 24 * 60 * 60  # Checkpoints older than this are pruned
+
+
+def build_checkpoint_key(
+    endpoint: str,
+    model: str,
+    items: list[tuple[str, bytes]],
+    split_plan: dict[str, Any],
+) -> str:
+    """
+    Build a checkpoint key from the endpoint, the model, the input file hashes and the split plan.
+
+    Args:
+        endpoint: Base URL of the API the chunks are sent to
+        model: Model or deployment name used for transcription
+        items: List of (filename, data) tuples in processing order
+        split_plan: Options that affect how the inputs are split into chunks
+
+    Returns:
+        Hex digest that identifies the job
+    """
+    digest = hashlib.sha256()
+    digest.update(endpoint.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(split_plan, sort_keys=True).encode("utf-8"))
+    for filename, data in items:
+        digest.update(b"\0")
+        digest.update((filename or "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # A unique temporary file per writer, so that concurrent runs of the same job never share one
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as tmp_file:
+        tmp_file.write(data)
+    try:
+        os.replace(tmp_file.name, path)
+    except OSError:
+        os.remove(tmp_file.name)
+        raise
+
+
+class DiarizationCheckpoint:
+    """
+    Local on-disk checkpoint of a diarization job.
+
+    Persists the split chunks and each completed chunk's segments and duration, so that
+    a rerun of the same job only sends the chunks that have not been transcribed yet.
+    Checkpoints are only readable by the plugin's user, and are removed when the job
+    completes or, for failed jobs, after CHECKPOINT_MAX_AGE_SEC.
+    """
+
+    def __init__(self, key: str, root_dir: str = CHECKPOINT_ROOT_DIR, logger=None):
+        self.key = key
+        self.directory = os.path.join(root_dir, key)
+        self.logger = logger
+        self._prune_expired(root_dir)
+
+    def _prune_expired(self, root_dir: str) -> None:
+        if not os.path.isdir(root_dir):
+            return
+        now = time.time()
+        for name in os.listdir(root_dir):
+            path = os.path.join(root_dir, name)
+            if not os.path.isdir(path):
+                continue
+            try:
+                if now - os.path.getmtime(path) > CHECKPOINT_MAX_AGE_SEC:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_json(self, name: str) -> Any:
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as json_file:
+                return json.load(json_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            if self.logger:
+                self.logger.info("Checkpoint %s is unreadable, ignored: %s", name, exc)
+            return None
+
+    def _makedirs(self) -> None:
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def _save_json(self, name: str, data: Any) -> None:
+        self._makedirs()
+        _write_atomic(self._path(name), json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def load_payloads(self) -> list[AudioPayload] | None:
+        plan = self._load_json("plan.json")
+        if not isinstance(plan, list):
+            return None
+
+        payloads: list[AudioPayload] = []
+        try:
+            for payload_index, entry in enumerate(plan, start=1):
+                with open(self._path(f"payload_{payload_index:03d}.bin"), "rb") as payload_file:
+                    data = payload_file.read()
+                time_map = entry.get("time_map")
+                payloads.append(
+                    AudioPayload(
+                        filename=entry["filename"],
+                        data=data,
+                        mime_type=entry["mime_type"],
+                        time_map=tuple((float(trimmed), float(original)) for trimmed, original in time_map)
+                        if time_map
+                        else None,
+                        original_duration_sec=entry.get("original_duration_sec"),
+                    )
+                )
+        except (OSError, KeyError, TypeError, ValueError) as exc:
+            if self.logger:
+                self.logger.info("Checkpoint chunks are incomplete, ignored: %s", exc)
+            return None
+
+        if self.logger:
+            self.logger.info("Restored %s chunk(s) from checkpoint", len(payloads))
+        return payloads
+
+    def save_payloads(self, payloads: list[AudioPayload]) -> None:
+        self._makedirs()
+        for payload_index, payload in enumerate(payloads, start=1):
+            _write_atomic(self._path(f"payload_{payload_index:03d}.bin"), payload.data)
+        # Write the plan last so that a partially written set of chunks is never used
+        self._save_json(
+            "plan.json",
+            [
+                {
+                    "filename": payload.filename,
+                    "mime_type": payload.mime_type,
+                    "time_map": payload.time_map,
+                    "original_duration_sec": payload.original_duration_sec,
+                }
+                for payload in payloads
+            ],
+        )
+
+    def load_chunk(self, chunk_index: int) -> tuple[list[dict[str, Any]], float] | None:
+        data = self._load_json(f"chunk_{chunk_index:03d}.json")
+        if not isinstance(data, dict):
+            return None
+        try:
+            return list(data["segments"]), float(data["audio_duration"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def save_chunk(self, chunk_index: int, segments: list[dict[str, Any]], audio_duration: float) -> None:
+        self._save_json(
+            f"chunk_{chunk_index:03d}.json",
+            {
+                "segments": segments,
+                "audio_duration": audio_duration,
+            },
+        )
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -3,6 +3,9 @@ Segment identifier utilities
 """
 
 from typing import Any
+import bisect
+import heapq
+import itertools
 import json
 from tools.utils.time_utils import adjust_segment_offsets
 
@@ -31,31 +34,89 @@ def update_segment_identifiers(segments: list[dict[str, Any]], file_index: int,
                 seg["id"] = f"file_{file_index}/{original_id}"
 
 
+def _segment_seconds(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _prefix_item_identifiers(segments: list[dict[str, Any]], item_index: int) -> None:
+    for segment in segments:
+        if "speaker" in segment and segment["speaker"]:
+            segment["speaker"] = f"{item_index}-{segment['speaker']}"
+        if "id" in segment:
+            segment["id"] = f"item_{item_index}/{segment['id']}"
+
+
+def _get_item_duration(item: dict[str, Any], segments: list[dict[str, Any]]) -> float:
+    metadata = item.get("metadata", {})
+
+    item_duration = 0.0
+    if isinstance(metadata, dict):
+        item_duration = float(metadata.get("total_duration_sec", 0.0))
+    if item_duration <= 0.0:
+        if segments:
+            item_duration = max(float(seg.get("end", 0.0)) for seg in segments)
+
+    return item_duration
+
+
 def concat_segments_items(items: list[dict[str, Any]]) -> dict[str, Any]:
     all_segments: list[dict[str, Any]] = []
     total_duration = 0.0
 
     for item_index, item in enumerate(items, start=1):
         segments = item.get("segments", [])
-        metadata = item.get("metadata", {})
 
         adjust_segment_offsets(segments, total_duration)
-
-        for segment in segments:
-            if "speaker" in segment and segment["speaker"]:
-                segment["speaker"] = f"{item_index}-{segment['speaker']}"
-            if "id" in segment:
-                segment["id"] = f"item_{item_index}/{segment['id']}"
+        _prefix_item_identifiers(segments, item_index)
         all_segments.extend(segments)
 
-        item_duration = 0.0
-        if isinstance(metadata, dict):
-            item_duration = float(metadata.get("total_duration_sec", 0.0))
-        if item_duration <= 0.0:
-            if segments:
-                item_duration = max(float(seg.get("end", 0.0)) for seg in segments)
+        total_duration += _get_item_duration(item, segments)
+
+    return {
+        "segments": all_segments,
+        "metadata": {
+            "total_duration_sec": total_duration,
+            "item_count": len(items),
+            "segment_count": len(all_segments),
+        },
+    }
+
 
-        total_duration += item_duration
+def merge_segments_by_start(tracks: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """
+    Merge per-track segment lists that are each ordered by start time into a single
+    list ordered by start time, with a k-way merge in O(n log k).
+    Segments with equal start times keep the track order.
+    """
+    return list(heapq.merge(*tracks, key=lambda segment: _segment_seconds(segment.get("start", 0.0))))
+
+
+def interleave_segments_items(items: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Merge items recorded simultaneously (e.g., one track per participant) into a single
+    timeline. Each item keeps its own timestamps, and segments from all items are
+    interleaved by start time with merge_segments_by_start.
+    """
+    tracks: list[list[dict[str, Any]]] = []
+    total_duration = 0.0
+
+    for item_index, item in enumerate(items, start=1):
+        segments = [segment for segment in item.get("segments", []) if isinstance(segment, dict)]
+
+        # Diarization output is already ordered by start; sort only out-of-order tracks
+        starts = [_segment_seconds(segment.get("start", 0.0)) for segment in segments]
+        if any(later < earlier for earlier, later in zip(starts, starts[1:])):
+            segments.sort(key=lambda segment: _segment_seconds(segment.get("start", 0.0)))
+
+        _prefix_item_identifiers(segments, item_index)
+        tracks.append(segments)
+
+        total_duration = max(total_duration, _get_item_duration(item, segments))
+
+    all_segments = merge_segments_by_start(tracks)
 
     return {
         "segments": all_segments,
@@ -142,6 +203,120 @@ def parse_segments_payload(segments_json_string: Any, segments_json_file: Any) -
     return normalize_segments_payload(segments_json_string)
 
 
+def parse_time_value(value: Any) -> float:
+    """
+    Parse a time value given as seconds (e.g. 2400, "2400.5") or as a clock string
+    ("MM:SS", "HH:MM:SS", optionally with fractional seconds) into seconds.
+    """
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        text = str(value).strip()
+        if not text:
+            raise ValueError("Time value must not be empty")
+        parts = text.split(":")
+        if len(parts) > 3:
+            raise ValueError(f"Invalid time value: {text}")
+        try:
+            numbers = [float(part) for part in parts]
+        except ValueError:
+            raise ValueError(f"Invalid time value: {text}")
+        seconds = 0.0
+        for number in numbers:
+            seconds = seconds * 60 + number
+
+    if seconds < 0:
+        raise ValueError("Time value must be 0 or positive")
+    return seconds
+
+
+class SegmentIndex:
+    """
+    Sorted interval index over segments for time-window and point queries.
+
+    Segments are sorted by start time once. Queries bisect the start times and the
+    running maximum of end times, then scan the segments in between. The scan covers
+    every segment from the earliest one that may still overlap the window, so it is
+    O(log n + k) for transcripts of short, mostly sequential segments, but degrades
+    to a linear scan when a long segment starts early (e.g. a music bed spanning
+    the whole recording).
+    """
+
+    def __init__(self, segments: list[dict[str, Any]]):
+        entries = [segment for segment in segments if isinstance(segment, dict)]
+        entries.sort(key=lambda segment: _segment_seconds(segment.get("start", 0.0)))
+        self._segments = entries
+        self._starts = [_segment_seconds(segment.get("start", 0.0)) for segment in entries]
+        self._ends = [_segment_seconds(segment.get("end", 0.0)) for segment in entries]
+        self._max_ends = list(itertools.accumulate(self._ends, max))
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    @property
+    def max_end(self) -> float:
+        return self._max_ends[-1] if self._max_ends else 0.0
+
+    def query(self, start_sec: float, end_sec: float) -> list[dict[str, Any]]:
+        """
+        Return segments overlapping the window in start order.
+        A zero-length window (start_sec == end_sec) is a point query and also matches
+        segments that start or end exactly at that point.
+        """
+        if end_sec < start_sec:
+            raise ValueError("end time must not be earlier than start time")
+
+        if start_sec == end_sec:
+            return self.at(start_sec)
+
+        lo = bisect.bisect_right(self._max_ends, start_sec)
+        hi = bisect.bisect_left(self._starts, end_sec)
+        return [self._segments[i] for i in range(lo, hi) if self._ends[i] > start_sec]
+
+    def at(self, time_sec: float) -> list[dict[str, Any]]:
+        """
+        Return segments that contain the given point in time.
+        """
+        lo = bisect.bisect_left(self._max_ends, time_sec)
+        hi = bisect.bisect_right(self._starts, time_sec)
+        return [self._segments[i] for i in range(lo, hi) if self._ends[i] >= time_sec]
+
+
+def slice_segments_payload(
+    payload: dict[str, Any],
+    start_sec: float | None,
+    end_sec: float | None,
+) -> dict[str, Any]:
+    """
+    Slice a segments payload to the segments overlapping [start_sec, end_sec].
+    Omitted bounds default to the beginning and the end of the payload.
+    """
+    segments = payload.get("segments", [])
+    if not isinstance(segments, list):
+        raise ValueError("segments must be an array")
+
+    index = SegmentIndex(segments)
+    if start_sec is None:
+        start_sec = 0.0
+    if end_sec is None:
+        end_sec = max(index.max_end, start_sec)
+    sliced = index.query(start_sec, end_sec)
+
+    metadata = payload.get("metadata", {})
+    metadata = dict(metadata) if isinstance(metadata, dict) else {}
+    metadata.update(
+        {
+            "slice_start_sec": start_sec,
+            "slice_end_sec": end_sec,
+            "segment_count": len(sliced),
+        }
+    )
+    return {
+        "segments": sliced,
+        "metadata": metadata,
+    }
+
+
 def _format_timestamp_vtt(seconds: float) -> str:
     total_ms = int(round(seconds * 1000))
     ms = total_ms % 1000
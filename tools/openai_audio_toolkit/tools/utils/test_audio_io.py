@@ -0,0 +1,27 @@
+import io
+from types import SimpleNamespace
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from tools.utils.audio_io import files_to_payloads
+
+
+def _wav_file(audio):
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    return SimpleNamespace(filename="meeting.wav", blob=buffer.getvalue())
+
+
+def test_files_to_payloads_trims_silence_without_splitting():
+    silence = AudioSegment.silent(duration=3000, frame_rate=16000).set_sample_width(2)
+    tone = Sine(440, sample_rate=16000).to_audio_segment(duration=1000, volume=-6.0).set_sample_width(2)
+    file = _wav_file(silence + tone + silence)
+
+    [untouched] = files_to_payloads(file)
+    assert (untouched.filename, untouched.data, untouched.time_map) == ("meeting.wav", file.blob, None)
+
+    [trimmed] = files_to_payloads(file, trim_silence=True)
+    assert trimmed.filename == "meeting.m4a"
+    assert trimmed.time_map == ((0.0, 2.7),)
+    assert trimmed.original_duration_sec == 7.0
@@ -0,0 +1,52 @@
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from tools.utils.audio_split import trim_audio_silence
+from tools.utils.time_utils import remap_trimmed_time
+
+SAMPLE_RATE = 16000
+KEEP_SILENCE_MS = 300
+
+
+def _silence(duration_ms):
+    return AudioSegment.silent(duration=duration_ms, frame_rate=SAMPLE_RATE).set_sample_width(2)
+
+
+def _tone(duration_ms):
+    return Sine(440, sample_rate=SAMPLE_RATE).to_audio_segment(duration=duration_ms, volume=-6.0).set_sample_width(2)
+
+
+def test_trim_audio_silence_keeps_padding_around_each_cut():
+    # silence 2s / tone 1s / silence 3s / tone 1s / silence 1.5s
+    audio = _silence(2000) + _tone(1000) + _silence(3000) + _tone(1000) + _silence(1500)
+
+    trimmed, time_map = trim_audio_silence(audio, keep_silence=KEEP_SILENCE_MS)
+
+    # leading and trailing silences are cut down to the padding, like the silence between the tones
+    assert time_map == [(0, 2000 - KEEP_SILENCE_MS), (1000 + 2 * KEEP_SILENCE_MS, 6000 - KEEP_SILENCE_MS)]
+    assert len(trimmed) == 2 * (1000 + 2 * KEEP_SILENCE_MS)
+    assert trimmed[:KEEP_SILENCE_MS].rms == 0
+    assert trimmed[-KEEP_SILENCE_MS:].rms == 0
+
+
+def test_trim_audio_silence_map_points_to_tone_onsets():
+    audio = _silence(2000) + _tone(1000) + _silence(3000) + _tone(1000) + _silence(1500)
+
+    _, time_map = trim_audio_silence(audio, keep_silence=KEEP_SILENCE_MS)
+
+    trimmed_starts = [trimmed_ms for trimmed_ms, _ in time_map]
+    original_starts = [original_ms for _, original_ms in time_map]
+    assert trimmed_starts == sorted(trimmed_starts) and original_starts == sorted(original_starts)
+    map_sec = [(trimmed_ms / 1000.0, original_ms / 1000.0) for trimmed_ms, original_ms in time_map]
+    onsets_on_trimmed = [KEEP_SILENCE_MS / 1000.0, (1000 + 3 * KEEP_SILENCE_MS) / 1000.0]
+    assert [remap_trimmed_time(onset, map_sec) for onset in onsets_on_trimmed] == pytest.approx([2.0, 6.0])
+
+
+def test_trim_audio_silence_without_long_silence_returns_none():
+    audio = _tone(1000) + _silence(500) + _tone(1000)
+
+    trimmed, time_map = trim_audio_silence(audio, min_silence_len=1000)
+
+    assert time_map is None
+    assert trimmed is audio
@@ -0,0 +1,68 @@
+import os
+import time
+
+from tools.utils.audio_io import AudioPayload
+from tools.utils.checkpoint_utils import CHECKPOINT_MAX_AGE_SEC, DiarizationCheckpoint, build_checkpoint_key
+
+
+def _key(**overrides):
+    arguments = {
+        "endpoint": "https://api.openai.com/v1",
+        "model": "gpt-4o-transcribe-diarize",
+        "items": [("a.mp3", b"aaa"), ("b.mp3", b"bbb")],
+        "split_plan": {"auto_split": True, "trim_silence": False},
+    }
+    arguments.update(overrides)
+    return build_checkpoint_key(**arguments)
+
+
+def test_build_checkpoint_key_is_stable_and_covers_the_job():
+    assert _key() == _key()
+    assert _key(split_plan={"trim_silence": False, "auto_split": True}) == _key()
+    assert _key(endpoint="https://example.openai.azure.com/") != _key()
+    assert _key(model="whisper-1") != _key()
+    assert _key(items=[("a.mp3", b"aaa"), ("b.mp3", b"bbx")]) != _key()
+    assert _key(items=[("b.mp3", b"bbb"), ("a.mp3", b"aaa")]) != _key()
+    assert _key(split_plan={"auto_split": False, "trim_silence": False}) != _key()
+
+
+def test_checkpoint_round_trip(tmp_path):
+    payloads = [
+        AudioPayload("chunk_1.mp3", b"one", "audio/mpeg"),
+        AudioPayload("chunk_2.mp3", b"two", "audio/mpeg", time_map=((0.0, 1.5), (2.0, 4.0)), original_duration_sec=5.0),
+    ]
+    checkpoint = DiarizationCheckpoint("job", root_dir=str(tmp_path))
+    assert checkpoint.load_payloads() is None
+    checkpoint.save_payloads(payloads)
+    checkpoint.save_chunk(1, [{"start": 0.0, "end": 1.0, "text": "hi", "speaker": "A"}], 1.0)
+
+    restored = DiarizationCheckpoint("job", root_dir=str(tmp_path))
+    assert restored.load_payloads() == payloads
+    assert restored.load_chunk(1) == ([{"start": 0.0, "end": 1.0, "text": "hi", "speaker": "A"}], 1.0)
+    assert restored.load_chunk(2) is None
+    assert not [name for name in os.listdir(checkpoint.directory) if name.endswith(".tmp")]
+
+    restored.clear()
+    assert not os.path.exists(checkpoint.directory)
+
+
+def test_checkpoint_ignores_corrupt_files(tmp_path):
+    checkpoint = DiarizationCheckpoint("job", root_dir=str(tmp_path))
+    checkpoint.save_payloads([AudioPayload("chunk_1.mp3", b"one", "audio/mpeg")])
+    checkpoint.save_chunk(1, [], 1.0)
+    with open(os.path.join(checkpoint.directory, "chunk_001.json"), "w", encoding="utf-8") as chunk_file:
+        chunk_file.write('{"segments": [')
+    os.remove(os.path.join(checkpoint.directory, "payload_001.bin"))
+
+    assert checkpoint.load_chunk(1) is None
+    assert checkpoint.load_payloads() is None
+
+
+def test_checkpoint_prunes_expired_jobs(tmp_path):
+    stale = DiarizationCheckpoint("stale", root_dir=str(tmp_path))
+    stale.save_chunk(1, [], 1.0)
+    expired = time.time() - CHECKPOINT_MAX_AGE_SEC - 60
+    os.utime(stale.directory, (expired, expired))
+
+    DiarizationCheckpoint("other", root_dir=str(tmp_path))
+    assert not os.path.exists(stale.directory)
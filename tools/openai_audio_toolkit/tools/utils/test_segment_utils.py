@@ -0,0 +1,101 @@
+import pytest
+
+from tools.utils.segment_utils import (
+    SegmentIndex,
+    interleave_segments_items,
+    parse_time_value,
+    slice_segments_payload,
+)
+
+
+def _segments():
+    return [
+        {"id": "seg_2", "start": 20.0, "end": 25.0, "text": "c", "speaker": "B"},
+        {"id": "seg_0", "start": 0.0, "end": 100.0, "text": "a", "speaker": "A"},
+        {"id": "seg_1", "start": 10.0, "end": 12.0, "text": "b", "speaker": "B"},
+        {"id": "seg_3", "start": 30.0, "end": 35.0, "text": "d", "speaker": "A"},
+    ]
+
+
+def test_parse_time_value():
+    patterns = [
+        (90, 90.0),
+        ("90.5", 90.5),
+        ("01:30", 90.0),
+        ("01:12:30", 4350.0),
+        ("00:00:01.250", 1.25),
+    ]
+    for value, expected in patterns:
+        assert parse_time_value(value) == expected
+
+    for value in ["", "abc", "1:2:3:4", "-5"]:
+        with pytest.raises(ValueError):
+            parse_time_value(value)
+
+
+def test_segment_index_query():
+    index = SegmentIndex(_segments())
+    patterns = [
+        (11.0, 21.0, ["seg_0", "seg_1", "seg_2"]),
+        (12.0, 20.0, ["seg_0"]),
+        (25.0, 30.0, ["seg_0"]),
+        (101.0, 200.0, []),
+        (0.0, 1000.0, ["seg_0", "seg_1", "seg_2", "seg_3"]),
+    ]
+    for start_sec, end_sec, expected in patterns:
+        assert [seg["id"] for seg in index.query(start_sec, end_sec)] == expected
+
+
+def test_segment_index_at():
+    index = SegmentIndex(_segments())
+    patterns = [
+        (12.0, ["seg_0", "seg_1"]),
+        (20.0, ["seg_0", "seg_2"]),
+        (100.0, ["seg_0"]),
+        (100.5, []),
+    ]
+    for time_sec, expected in patterns:
+        assert [seg["id"] for seg in index.at(time_sec)] == expected
+        assert [seg["id"] for seg in index.query(time_sec, time_sec)] == expected
+
+
+def test_slice_segments_payload():
+    payload = {"segments": _segments(), "metadata": {"total_duration_sec": 100.0}}
+    sliced = slice_segments_payload(payload, 28.0, None)
+    assert [seg["id"] for seg in sliced["segments"]] == ["seg_0", "seg_3"]
+    assert sliced["metadata"] == {
+        "total_duration_sec": 100.0,
+        "slice_start_sec": 28.0,
+        "slice_end_sec": 100.0,
+        "segment_count": 2,
+    }
+
+
+def test_interleave_segments_items():
+    items = [
+        {
+            "segments": [
+                {"id": "seg_0", "start": 0.0, "end": 4.0, "speaker": "A"},
+                {"id": "seg_1", "start": 10.0, "end": 12.0, "speaker": "A"},
+            ],
+            "metadata": {"total_duration_sec": 60.0},
+        },
+        {
+            "segments": [
+                {"id": "seg_1", "start": 11.0, "end": 13.0, "speaker": "A"},
+                {"id": "seg_0", "start": 5.0, "end": 9.0, "speaker": "A"},
+            ],
+        },
+    ]
+    payload = interleave_segments_items(items)
+    assert [(seg["id"], seg["speaker"], seg["start"]) for seg in payload["segments"]] == [
+        ("item_1/seg_0", "1-A", 0.0),
+        ("item_2/seg_0", "2-A", 5.0),
+        ("item_1/seg_1", "1-A", 10.0),
+        ("item_2/seg_1", "2-A", 11.0),
+    ]
+    assert payload["metadata"] == {
+        "total_duration_sec": 60.0,
+        "item_count": 2,
+        "segment_count": 4,
+    }
@@ -0,0 +1,28 @@
+from tools.utils.time_utils import remap_segment_times, remap_trimmed_time, slice_time_map
+
+# Kept regions of the original recording: [3.7, 14.3), [33.7, 39.3), [41.7, 50.3)
+TIME_MAP = [(0.0, 3.7), (10.6, 33.7), (16.2, 41.7)]
+
+
+def test_remap_trimmed_time_maps_into_kept_regions():
+    assert remap_trimmed_time(0.0, TIME_MAP) == 3.7
+    assert round(remap_trimmed_time(12.0, TIME_MAP), 3) == 35.1
+    assert round(remap_trimmed_time(17.0, TIME_MAP), 3) == 42.5
+
+
+def test_remap_trimmed_time_keeps_end_on_cut_in_previous_region():
+    assert remap_trimmed_time(10.6, TIME_MAP) == 33.7
+    assert round(remap_trimmed_time(10.6, TIME_MAP, is_end=True), 3) == 14.3
+
+
+def test_remap_segment_times_without_map_is_noop():
+    segments = [{"start": 1.0, "end": 2.0}]
+    remap_segment_times(segments, None)
+    assert segments == [{"start": 1.0, "end": 2.0}]
+
+
+def test_slice_time_map_is_relative_to_chunk():
+    original_start = remap_trimmed_time(12.0, TIME_MAP)
+    chunk_map = slice_time_map(TIME_MAP, 12.0, 24.0, original_start)
+    assert chunk_map == [(0.0, 0.0), (4.2, 6.6)]
+    assert round(original_start + remap_trimmed_time(5.0, chunk_map), 3) == 42.5
@@ -0,0 +1,87 @@
+import io
+import logging
+from types import SimpleNamespace
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from tools.utils import transcribe_utils
+from tools.utils.audio_io import AudioPayload, split_stereo_channels
+
+logger = logging.getLogger(__name__)
+
+
+class FakeTranscriptions:
+    """
+    Returns one segment per second of the fake audio, whose content is "<channel>:<seconds>".
+    """
+
+    def __init__(self):
+        self.models = []
+
+    def create(self, file, model, **kwargs):
+        self.models.append(model)
+        channel, seconds = file.read().decode().split(":")
+        segments = [
+            SimpleNamespace(id=index, start=index + 0.5, end=index + 1.0, text=f"{channel} {index}")
+            for index in range(int(seconds))
+        ]
+        return SimpleNamespace(segments=segments, duration=float(seconds))
+
+
+def _fake_client():
+    return SimpleNamespace(audio=SimpleNamespace(transcriptions=FakeTranscriptions()))
+
+
+def test_channel_split_transcribe_tags_and_merges_channels(monkeypatch):
+    monkeypatch.setattr(transcribe_utils, "probe_audio_channels", lambda *args, **kwargs: 2)
+    monkeypatch.setattr(
+        transcribe_utils,
+        "split_stereo_channels",
+        lambda data, filename, logger=None: [
+            AudioPayload("call_left.m4a", b"left:" + data, "audio/mp4"),
+            AudioPayload("call_right.m4a", b"right:" + data, "audio/mp4"),
+        ],
+    )
+    client = _fake_client()
+    files = [SimpleNamespace(filename="call.wav", blob=b"2"), SimpleNamespace(filename="call.wav", blob=b"1")]
+
+    segments, offset_end = transcribe_utils.channel_split_transcribe_files(
+        client,
+        "whisper-1",
+        files,
+        speaker_names=("Agent", "Customer"),
+        auto_split=False,
+        use_silence_detection=False,
+        logger=logger,
+    )
+
+    assert offset_end == 3.0
+    assert client.audio.transcriptions.models == ["whisper-1"] * 4
+    assert [(segment["speaker"], segment["text"], segment["start"]) for segment in segments] == [
+        ("Agent", "left 0", 0.5),
+        ("Customer", "right 0", 0.5),
+        ("Agent", "left 1", 1.5),
+        ("Customer", "right 1", 1.5),
+        ("Agent", "left 0", 2.5),
+        ("Customer", "right 0", 2.5),
+    ]
+    assert segments[0]["id"] == "file_1/left/seg_0"
+    assert segments[-1]["id"] == "file_2/right/seg_0"
+
+
+def test_split_stereo_channels_separates_left_and_right():
+    sample_rate = 16000
+    silence = AudioSegment.silent(duration=1000, frame_rate=sample_rate).set_sample_width(2)
+    tone = Sine(440, sample_rate=sample_rate).to_audio_segment(duration=1000, volume=-6.0).set_sample_width(2)
+    stereo = AudioSegment.from_mono_audiosegments(silence, tone)
+    buffer = io.BytesIO()
+    stereo.export(buffer, format="wav")
+
+    left, right = split_stereo_channels(buffer.getvalue(), "call.wav")
+    assert (left.filename, right.filename) == ("call_left.m4a", "call_right.m4a")
+
+    def rms(payload):
+        return AudioSegment.from_file(io.BytesIO(payload.data), format="mp4", codec="aac").rms
+
+    assert rms(left) < 100 < rms(right)
@@ -2,7 +2,11 @@
 Time/offset utilities for audio segment processing
 """
 
-from typing import Any
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import Any, Sequence
+
+TimeMap = Sequence[tuple[float, float]]
 
 
 def adjust_segment_offsets(segments: list[dict[str, Any]], offset_seconds: float) -> None:
@@ -14,3 +18,50 @@ def adjust_segment_offsets(segments: list[dict[str, Any]], offset_seconds: float
             seg["start"] = float(seg["start"]) + offset_seconds
         if "end" in seg:
             seg["end"] = float(seg["end"]) + offset_seconds
+
+
+def remap_trimmed_time(time_sec: float, time_map: TimeMap | None, is_end: bool = False) -> float:
+    """
+    Map a time on silence-trimmed audio back to the original recording.
+
+    time_map holds (trimmed_start_sec, original_start_sec) anchors sorted by trimmed start.
+    An end time that falls exactly on a cut stays in the region before the cut.
+    """
+    if not time_map:
+        return time_sec
+    search = bisect_left if is_end else bisect_right
+    index = max(search(time_map, time_sec, key=itemgetter(0)) - 1, 0)
+    trimmed_start, original_start = time_map[index]
+    return original_start + (time_sec - trimmed_start)
+
+
+def remap_segment_times(segments: list[dict[str, Any]], time_map: TimeMap | None) -> None:
+    """
+    Remap start and end times of segments from trimmed to original time (in-place).
+    """
+    if not time_map:
+        return
+    for seg in segments:
+        if "start" in seg:
+            seg["start"] = remap_trimmed_time(float(seg["start"]), time_map)
+        if "end" in seg:
+            seg["end"] = remap_trimmed_time(float(seg["end"]), time_map, is_end=True)
+
+
+def slice_time_map(
+    time_map: TimeMap,
+    start_sec: float,
+    end_sec: float,
+    original_start_sec: float,
+) -> list[tuple[float, float]]:
+    """
+    Extract the anchors of a chunk covering [start_sec, end_sec) of the trimmed audio.
+
+    The returned anchors are relative to the chunk, on both the trimmed and original side.
+    """
+    chunk_map = [(0.0, round(remap_trimmed_time(start_sec, time_map) - original_start_sec, 3))]
+    first = bisect_right(time_map, start_sec, key=itemgetter(0))
+    last = bisect_left(time_map, end_sec, key=itemgetter(0))
+    for trimmed_start, original_start in time_map[first:last]:
+        chunk_map.append((round(trimmed_start - start_sec, 3), round(original_start - original_start_sec, 3)))
+    return chunk_map
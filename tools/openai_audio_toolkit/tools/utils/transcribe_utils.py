@@ -2,6 +2,7 @@
 Transcription utilities for diarized speech-to-text
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 import io
 import time
@@ -17,11 +18,19 @@ from tools.utils.audio_io import (
     get_file_extension,
     is_audio_format,
     load_audio_from_bytes,
+    probe_audio_channels,
     split_audio_files,
+    split_audio_payloads,
+    split_stereo_channels,
     files_to_payloads,
 )
-from tools.utils.time_utils import adjust_segment_offsets
-from tools.utils.segment_utils import update_segment_identifiers
+from tools.utils.checkpoint_utils import DiarizationCheckpoint, build_checkpoint_key
+from tools.utils.time_utils import adjust_segment_offsets, remap_segment_times
+from tools.utils.segment_utils import merge_segments_by_start, update_segment_identifiers
+
+
+# Model used where segment timestamps (verbose_json) are required
+TIMESTAMPED_TRANSCRIPTION_MODEL = "whisper-1"
 
 
 def transcribe_diarized_chunk(
@@ -75,6 +84,50 @@ def transcribe_diarized_chunk(
     return segments, audio_duration
 
 
+def transcribe_timestamped_chunk(
+    client: openai.OpenAI | openai.AzureOpenAI,
+    model: str,
+    audio_bytes: bytes,
+    extension: str,
+    label: str,
+    logger=None,
+) -> tuple[list[dict[str, Any]], float]:
+    audio_stream = io.BytesIO(audio_bytes)
+    audio_stream.name = f"chunk.{extension}"
+
+    if logger:
+        logger.info("%s: Transcribing chunk (%s)", label, extension)
+
+    start_time = time.time()
+
+    response = client.audio.transcriptions.create(
+        file=audio_stream,
+        model=model,
+        response_format="verbose_json",
+        timestamp_granularities=["segment"],
+    )
+
+    api_duration = time.time() - start_time
+    if logger:
+        logger.info("%s: API call finished in %.1fs", label, api_duration)
+
+    segments = [
+        {
+            "id": f"seg_{seg.id}",
+            "start": float(seg.start),
+            "end": float(seg.end),
+            "text": seg.text,
+        }
+        for seg in (response.segments or [])
+    ]
+    audio_duration = float(response.duration or 0.0)
+    if audio_duration <= 0.0 and segments:
+        audio_duration = max(seg["end"] for seg in segments)
+    if logger:
+        logger.info("%s: Received %s segment(s)", label, len(segments))
+    return segments, audio_duration
+
+
 def create_openai_client(
     service: str,
     api_key: str,
@@ -145,6 +198,7 @@ def diarize_audio_files(
     model: str,
     input_files: File | AudioPayload | list[File] | list[AudioPayload],
     logger,
+    checkpoint: DiarizationCheckpoint | None = None,
 ) -> tuple[list[dict[str, Any]], float]:
     normalized_files = input_files if isinstance(input_files, list) else [input_files]
     is_single_file = len(normalized_files) == 1
@@ -171,14 +225,28 @@ def diarize_audio_files(
         file_size_mb = len(audio_bytes) / (1024 * 1024)
         logger.info("File %s: %.1fMB", file_index, file_size_mb)
 
-        segments, audio_duration = transcribe_diarized_chunk(
-            client,
-            model,
-            audio_bytes,
-            extension,
-            file_index,
-            logger,
-        )
+        restored = checkpoint.load_chunk(file_index) if checkpoint else None
+        if restored is not None:
+            segments, audio_duration = restored
+            logger.info("File %s: Restored %s segment(s) from checkpoint", file_index, len(segments))
+        else:
+            segments, audio_duration = transcribe_diarized_chunk(
+                client,
+                model,
+                audio_bytes,
+                extension,
+                file_index,
+                logger,
+            )
+            if checkpoint:
+                checkpoint.save_chunk(file_index, segments, audio_duration)
+
+        # Silence-trimmed chunks report trimmed times; map them back to the original recording
+        time_map = getattr(input_file, "time_map", None)
+        if time_map:
+            remap_segment_times(segments, time_map)
+            audio_duration = input_file.original_duration_sec or audio_duration
+
         if not is_single_file:
             update_segment_identifiers(segments, file_index, 0)
             adjust_segment_offsets(segments, offset_end)
@@ -195,9 +263,36 @@ def diarize_audio_files(
             offset_end,
         )
 
+    if checkpoint:
+        checkpoint.clear()
+
     return all_segments, offset_end
 
 
+def create_diarization_checkpoint(
+    client: openai.OpenAI | openai.AzureOpenAI,
+    model: str,
+    input_files: File | AudioPayload | list[File] | list[AudioPayload],
+    split_plan: dict[str, Any],
+    logger=None,
+) -> DiarizationCheckpoint:
+    normalized_files = input_files if isinstance(input_files, list) else [input_files]
+    items = [
+        (
+            getattr(input_file, "filename", None) or "",
+            input_file.blob if hasattr(input_file, "blob") else input_file.data,
+        )
+        for input_file in normalized_files
+        if input_file
+    ]
+    checkpoint = DiarizationCheckpoint(
+        build_checkpoint_key(str(client.base_url), model, items, split_plan), logger=logger
+    )
+    if logger:
+        logger.info("Checkpoint: %s", checkpoint.key[:12])
+    return checkpoint
+
+
 def all_in_one_diarize_files(
     client: openai.OpenAI | openai.AzureOpenAI,
     model: str,
@@ -205,13 +300,34 @@ def all_in_one_diarize_files(
     auto_split: bool,
     use_silence_detection: bool,
     logger,
+    use_checkpoint: bool = False,
+    trim_silence: bool = False,
 ) -> tuple[list[dict[str, Any]], float]:
-    if auto_split:
-        payloads = split_audio_files(input_files, use_silence_detection=use_silence_detection, logger=logger)
-    else:
-        payloads = files_to_payloads(input_files, logger=logger)
-
-    return diarize_audio_files(client, model, payloads, logger)
+    checkpoint = None
+    payloads = None
+    if use_checkpoint:
+        split_plan = {
+            "auto_split": auto_split,
+            "use_silence_detection": use_silence_detection,
+            "trim_silence": trim_silence,
+        }
+        checkpoint = create_diarization_checkpoint(client, model, input_files, split_plan, logger=logger)
+        payloads = checkpoint.load_payloads()
+
+    if payloads is None:
+        if auto_split:
+            payloads = split_audio_files(
+                input_files,
+                use_silence_detection=use_silence_detection,
+                logger=logger,
+                trim_silence=trim_silence,
+            )
+        else:
+            payloads = files_to_payloads(input_files, logger=logger, trim_silence=trim_silence)
+        if checkpoint:
+            checkpoint.save_payloads(payloads)
+
+    return diarize_audio_files(client, model, payloads, logger, checkpoint=checkpoint)
 
 
 def all_in_one_transcribe_files(
@@ -221,10 +337,136 @@ def all_in_one_transcribe_files(
     auto_split: bool,
     use_silence_detection: bool,
     logger,
+    trim_silence: bool = False,
 ) -> str:
     if auto_split:
-        payloads = split_audio_files(input_files, use_silence_detection=use_silence_detection, logger=logger)
+        payloads = split_audio_files(
+            input_files,
+            use_silence_detection=use_silence_detection,
+            logger=logger,
+            trim_silence=trim_silence,
+        )
     else:
-        payloads = files_to_payloads(input_files, logger=logger)
+        payloads = files_to_payloads(input_files, logger=logger, trim_silence=trim_silence)
 
     return transcribe_text_files(client, model, payloads, logger)
+
+
+def _transcribe_channel(
+    client: openai.OpenAI | openai.AzureOpenAI,
+    model: str,
+    payloads: list[AudioPayload],
+    speaker: str,
+    label: str,
+    logger,
+) -> tuple[list[dict[str, Any]], float]:
+    channel_segments: list[dict[str, Any]] = []
+    offset_end = 0.0
+
+    for chunk_index, payload in enumerate(payloads, start=1):
+        chunk_label = f"{label} chunk {chunk_index}" if len(payloads) > 1 else label
+        segments, audio_duration = transcribe_timestamped_chunk(
+            client,
+            model,
+            payload.data,
+            get_file_extension(payload.filename),
+            chunk_label,
+            logger,
+        )
+        for seg in segments:
+            seg["speaker"] = speaker
+            if len(payloads) > 1:
+                seg["id"] = f"chunk_{chunk_index}/{seg['id']}"
+        adjust_segment_offsets(segments, offset_end)
+        channel_segments.extend(segments)
+        offset_end += audio_duration
+
+    return channel_segments, offset_end
+
+
+def channel_split_transcribe_files(
+    client: openai.OpenAI | openai.AzureOpenAI,
+    model: str,
+    input_files: File | list[File],
+    speaker_names: tuple[str, str],
+    auto_split: bool,
+    use_silence_detection: bool,
+    logger,
+) -> tuple[list[dict[str, Any]], float]:
+    """
+    Transcribe stereo recordings with one speaker per channel (e.g., agent on the left and
+    customer on the right). Each channel is transcribed concurrently with timestamps and the
+    results are merged by time with fixed speaker labels, without a diarization model.
+    """
+    normalized_files = input_files if isinstance(input_files, list) else [input_files]
+    is_single_file = len(normalized_files) == 1
+
+    all_segments: list[dict[str, Any]] = []
+    offset_end = 0.0
+
+    for file_index, input_file in enumerate(normalized_files, start=1):
+        if not input_file:
+            continue
+
+        filename = input_file.filename or f"file_{file_index}"
+        extension = get_file_extension(filename)
+        if not is_audio_format(extension):
+            logger.info("File %s: Unsupported audio format (%s), skipping", file_index, extension)
+            continue
+
+        audio_bytes = input_file.blob
+        channels = probe_audio_channels(audio_bytes, extension, logger=logger)
+        if channels is not None and channels != 2:
+            raise ToolProviderCredentialValidationError(
+                f"File {file_index}: Stereo audio is required (found {channels} channel(s))"
+            )
+
+        logger.info("File %s: Splitting channels", file_index)
+        channel_payloads = split_stereo_channels(audio_bytes, filename, logger=logger)
+        if auto_split:
+            channel_chunks = [
+                split_audio_payloads([payload], use_silence_detection=use_silence_detection, logger=logger)
+                for payload in channel_payloads
+            ]
+        else:
+            channel_chunks = [[payload] for payload in channel_payloads]
+
+        channel_keys = ("left", "right")
+        with ThreadPoolExecutor(max_workers=len(channel_keys)) as executor:
+            futures = [
+                executor.submit(
+                    _transcribe_channel,
+                    client,
+                    model,
+                    chunks,
+                    speaker_names[channel_index],
+                    f"File {file_index} {channel_keys[channel_index]}",
+                    logger,
+                )
+                for channel_index, chunks in enumerate(channel_chunks)
+            ]
+            results = [future.result() for future in futures]
+
+        tracks: list[list[dict[str, Any]]] = []
+        for channel_key, (segments, _) in zip(channel_keys, results):
+            for seg in segments:
+                seg["id"] = f"{channel_key}/{seg['id']}"
+            tracks.append(segments)
+        segments = merge_segments_by_start(tracks)
+        file_duration = max(duration for _, duration in results)
+
+        if not is_single_file:
+            for seg in segments:
+                seg["id"] = f"file_{file_index}/{seg['id']}"
+            adjust_segment_offsets(segments, offset_end)
+
+        all_segments.extend(segments)
+        offset_end += file_duration
+        logger.info(
+            "File %s: Completed (%s segments, total offset: %.1fs)",
+            file_index,
+            len(segments),
+            offset_end,
+        )
+
+    return all_segments, offset_end
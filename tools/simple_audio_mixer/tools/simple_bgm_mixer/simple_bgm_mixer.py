@@ -1,131 +1,78 @@
 from collections.abc import Generator
 from typing import Any
-from pydub import AudioSegment
-import math
-import io
 
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 
-
-class SimpleBGMMixerTool(Tool):
-    @staticmethod
-    def _convert_ratio_to_db(ratio):
-        return 20 * math.log10(ratio)
-
-    @staticmethod
-    def _get_mime_type(output_format: str) -> str:
-        mime_types = {
-            "wav": "audio/wav",
-            "mp3": "audio/mpeg",
-        }
-        return mime_types.get(output_format, "audio/mpeg")
+from tools.utils.audio_engine import decode_audio
+from tools.utils.audio_stream import ArrayReader, DecodeStream, EncodeStream, encode_audio, probe_sample_rate
+from tools.utils.decode_cache import DecodedAudioCache
+from tools.utils.ffmpeg_render import render_bgm_mix_ffmpeg
+from tools.utils.gain_envelope import BGMMixSettings, analyze_ducking, iter_bgm_mix_blocks, render_bgm_mix
+from tools.utils.loudness import LoudnessSettings
+from tools.utils.output_profile import OutputSettings
 
 
+class SimpleBGMMixerTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage]:
         try:
             # param: audio files
             voice_file = tool_parameters.get("voice_file")
             bgm_file = tool_parameters.get("bgm_file")
-
-            # param: durations
-            a_bgm_intro_fadein_ms = tool_parameters.get("a_bgm_intro_fadein_ms", 100)
-            b_bgm_intro_play_ms = tool_parameters.get("b_bgm_intro_play_ms", 5000)
-            c_bgm_intro_fadeout_ms = tool_parameters.get("c_bgm_intro_fadeout_ms", 1000)
-            d_bgm_pre_voice_delay_ms = tool_parameters.get("d_bgm_pre_voice_delay_ms", 500)
-            e_bgm_post_voice_delay_ms = tool_parameters.get("e_bgm_post_voice_delay_ms", 1000)
-            f_bgm_outro_fadein_ms = tool_parameters.get("f_bgm_outro_fadein_ms", 1000)
-            g_bgm_outro_play_ms = tool_parameters.get("g_bgm_outro_play_ms", 5000)
-            h_bgm_outro_fadeout_ms = tool_parameters.get("h_bgm_outro_fadeout_ms", 5000)
-    
-            # param: volume ratios
-            i_voice_volume_ratio = tool_parameters.get("i_voice_volume_ratio", 1.0)
-            j_bgm_intro_volume_ratio = tool_parameters.get("j_bgm_intro_volume_ratio", 1.0)
-            k_bgm_during_voice_volume_ratio = tool_parameters.get("k_bgm_during_voice_volume_ratio", 0.2)
-            l_bgm_outro_volume_ratio = tool_parameters.get("l_bgm_outro_volume_ratio", 1.0)
-            z_master_volume_ratio = tool_parameters.get("z_master_volume_ratio", 1.0)
-    
-            # param: output format
-            output_format = tool_parameters.get("output_format", "mp3")
-
-            # load audio files
             voice_format = voice_file.extension.lstrip(".")
             bgm_format = bgm_file.extension.lstrip(".")
-            voice = AudioSegment.from_file(io.BytesIO(voice_file.blob), format=voice_format)
-            bgm = AudioSegment.from_file(io.BytesIO(bgm_file.blob), format=bgm_format)
-            if voice.channels == 1:
-                voice = voice.set_channels(2)
-            if bgm.channels == 1:
-                bgm = bgm.set_channels(2)
 
-            # calc durations and make bgm long enough
-            intro_duration = a_bgm_intro_fadein_ms + b_bgm_intro_play_ms + c_bgm_intro_fadeout_ms + d_bgm_pre_voice_delay_ms
-            outro_duration = f_bgm_outro_fadein_ms + g_bgm_outro_play_ms + h_bgm_outro_fadeout_ms + e_bgm_post_voice_delay_ms
-            total_duration = intro_duration + len(voice) + outro_duration
-            bgm = bgm * (total_duration // len(bgm) + 1)
+            # param: durations and volume ratios
+            settings = BGMMixSettings.from_tool_parameters(tool_parameters)
+
+            # param: output format, sample rate, channels and bitrate
+            output = OutputSettings.from_tool_parameters(tool_parameters)
+            render_mode = tool_parameters.get("render_mode") or "memory"
+
+            # param: loudness normalization
+            loudness = LoudnessSettings.from_tool_parameters(tool_parameters)
 
-            # construct bgm
-            # 1) intro, fade-in
-            intro_fadein = bgm[:a_bgm_intro_fadein_ms].fade_in(a_bgm_intro_fadein_ms).apply_gain(self._convert_ratio_to_db(j_bgm_intro_volume_ratio))
-            # 2) intro, play
-            _start_intro_play = a_bgm_intro_fadein_ms
-            _end_intro_play = _start_intro_play + b_bgm_intro_play_ms
-            intro_play = bgm[_start_intro_play:_end_intro_play].apply_gain(self._convert_ratio_to_db(j_bgm_intro_volume_ratio))
-            # 3) intro, fade-out
-            _start_intro_fadeout = _end_intro_play
-            _end_intro_fadeout = _start_intro_fadeout + c_bgm_intro_fadeout_ms
-            intro_fadeout = bgm[_start_intro_fadeout:_end_intro_fadeout].fade(
-                from_gain=self._convert_ratio_to_db(j_bgm_intro_volume_ratio),
-                to_gain=self._convert_ratio_to_db(k_bgm_during_voice_volume_ratio),
-                start=0,
-                duration=c_bgm_intro_fadeout_ms
-            )
-            # 4) intro, pre-voice delay
-            _start_pre_voice_delay = _end_intro_fadeout
-            _end_pre_voice_delay = _start_pre_voice_delay + d_bgm_pre_voice_delay_ms
-            pre_voice_delay = bgm[_start_pre_voice_delay:_end_pre_voice_delay].apply_gain(self._convert_ratio_to_db(k_bgm_during_voice_volume_ratio))
-            # 5) voice
-            _start_voice = _end_pre_voice_delay
-            _end_voice = _start_voice + len(voice)
-            voice_section = bgm[_start_voice:_end_voice].apply_gain(self._convert_ratio_to_db(k_bgm_during_voice_volume_ratio))
-            # 6) outro, post-voice delay
-            _start_post_voice_delay = _end_voice
-            _end_post_voice_delay = _start_post_voice_delay + e_bgm_post_voice_delay_ms
-            post_voice_delay = bgm[_start_post_voice_delay:_end_post_voice_delay].apply_gain(self._convert_ratio_to_db(k_bgm_during_voice_volume_ratio))
-            # 7) outro, fade-in
-            _start_outro_fadein = _end_post_voice_delay
-            _end_outro_fadein = _start_outro_fadein + f_bgm_outro_fadein_ms
-            outro_fadein = bgm[_start_outro_fadein:_end_outro_fadein].fade(
-                from_gain=self._convert_ratio_to_db(k_bgm_during_voice_volume_ratio),
-                to_gain=self._convert_ratio_to_db(l_bgm_outro_volume_ratio),
-                start=0,
-                duration=f_bgm_outro_fadein_ms
-            )
-            # 8) outro, play
-            _start_outro_play = _end_outro_fadein
-            _end_outro_play = _start_outro_play + g_bgm_outro_play_ms
-            outro_play = bgm[_start_outro_play:_end_outro_play].apply_gain(self._convert_ratio_to_db(l_bgm_outro_volume_ratio))
-            # 9) outro, fade-out
-            _start_outro_fadeout = _end_outro_play
-            _end_outro_fadeout = _start_outro_fadeout + h_bgm_outro_fadeout_ms
-            outro_fadeout = bgm[_start_outro_fadeout:_end_outro_fadeout].fade_out(h_bgm_outro_fadeout_ms).apply_gain(self._convert_ratio_to_db(l_bgm_outro_volume_ratio))
-            # 10) combine all sections
-            bgm_final = intro_fadein + intro_play + intro_fadeout + pre_voice_delay + voice_section + post_voice_delay + outro_fadein + outro_play + outro_fadeout
+            # mix at the output sample rate, or at the rate of the voice in the native mode
+            sample_rate = output.sample_rate or probe_sample_rate(voice_file.blob, voice_format)
 
-            # mix voice with bgm
-            mixed = bgm_final.overlay(voice.apply_gain(self._convert_ratio_to_db(i_voice_volume_ratio)), position=intro_duration)
+            if render_mode == "ffmpeg":
+                # render the whole mix in a single ffmpeg filter graph
+                blob = render_bgm_mix_ffmpeg(
+                    (voice_file.blob, voice_format),
+                    (bgm_file.blob, bgm_format),
+                    settings,
+                    output,
+                    sample_rate,
+                )
+            elif render_mode == "streaming":
+                # stream voice from ffmpeg, render and encode block by block; bgm is looped, so it is kept in memory
+                # (the same bgm is usually reused across episodes, so its decoded samples are cached on disk)
+                bgm = DecodedAudioCache().decode(bgm_file.blob, bgm_format, sample_rate)
+                ducking = None
+                if settings.auto_ducking:
+                    # analyze the voice level in a separate pass, keeping only one value per frame
+                    with DecodeStream(voice_file.blob, voice_format, sample_rate) as voice_stream:
+                        ducking = analyze_ducking(voice_stream, settings, sample_rate)
+                with (
+                    DecodeStream(voice_file.blob, voice_format, sample_rate) as voice_stream,
+                    EncodeStream(output, sample_rate) as encoder,
+                ):
+                    for _, block in iter_bgm_mix_blocks(voice_stream, bgm, settings, sample_rate, ducking=ducking):
+                        encoder.write(block)
+                    blob = encoder.finish()
+            else:
+                # render bgm through the gain envelope and mix voice in a single pass
+                voice = decode_audio(voice_file.blob, voice_format, sample_rate)
+                bgm = DecodedAudioCache().decode(bgm_file.blob, bgm_format, sample_rate)
+                ducking = analyze_ducking(ArrayReader(voice), settings, sample_rate) if settings.auto_ducking else None
+                mixed = render_bgm_mix(voice, bgm, settings, sample_rate, ducking=ducking, clip=not loudness.enabled)
+                mixed = loudness.apply(mixed, sample_rate)
 
-            # apply master volume
-            mixed = mixed.apply_gain(self._convert_ratio_to_db(z_master_volume_ratio))
+                # pipe the mixed buffer to the encoder
+                blob = encode_audio(mixed, output, sample_rate)
 
-            # export the final mixed audio
-            buffer = io.BytesIO()
-            if output_format == "wav":
-                mixed.export(buffer, format=output_format, parameters=["-ar", "44100"])
-            elif output_format == "mp3":
-                mixed.export(buffer, format=output_format, parameters=["-ar", "44100"], bitrate="160k")
-            yield self.create_blob_message(blob=buffer.getvalue(), meta={"mime_type": self._get_mime_type(output_format)})
+            yield self.create_blob_message(blob=blob, meta={"mime_type": output.profile.mime_type})
 
         except Exception as e:
             raise ToolProviderCredentialValidationError(f"Error generating mixed audio: {str(e)}")
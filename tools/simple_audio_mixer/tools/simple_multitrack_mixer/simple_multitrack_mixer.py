@@ -0,0 +1,34 @@
+from collections.abc import Generator
+from typing import Any
+
+from dify_plugin import Tool
+from dify_plugin.entities.tool import ToolInvokeMessage
+from dify_plugin.errors.tool import ToolProviderCredentialValidationError
+
+from tools.utils.stereo_mix import mix_audio_files
+
+
+class SimpleMultitrackMixerTool(Tool):
+    @staticmethod
+    def _extract_values(colon_separated_string: str | None, count: int, default: float) -> list[float]:
+        # tracks without an explicit value fall back to the default
+        values = [float(value) for value in (colon_separated_string or "").split(":") if value.strip()]
+        if len(values) > count:
+            raise ValueError(f"Got {len(values)} values for {count} audio files")
+        return values + [default] * (count - len(values))
+
+    def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage]:
+        try:
+            # params
+            audio_files = [file for file in tool_parameters.get("audio_files") or [] if file is not None]
+            if not audio_files:
+                raise ValueError("At least one audio file is required")
+            pannings = self._extract_values(tool_parameters.get("pannings"), len(audio_files), 0.0)
+            volume_ratios = self._extract_values(tool_parameters.get("volume_ratios"), len(audio_files), 1.0)
+
+            # decode, mix and encode
+            blob, mime_type = mix_audio_files(audio_files, pannings, volume_ratios, tool_parameters)
+            yield self.create_blob_message(blob=blob, meta={"mime_type": mime_type})
+
+        except Exception as e:
+            raise ToolProviderCredentialValidationError(f"Error generating mixed audio: {str(e)}")
@@ -0,0 +1,165 @@
+"""
+Audio mixing engine (decode to float32 NumPy arrays, gain/pan and single-pass mixing)
+"""
+
+import math
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_CHANNELS = 2
+MAX_DECODE_WORKERS = 8  # Each decode is an ffmpeg subprocess, so threads only wait on I/O
+
+
+def _parse_wav_stream(buffer: bytes) -> tuple[int, int]:
+    """
+    Return (channels, data offset) of a WAV stream written by ffmpeg to a pipe.
+
+    Chunk sizes of a piped WAV stream are not finalized, so the data chunk is assumed to
+    run until the end of the buffer.
+    """
+    if buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        raise RuntimeError("Failed to decode audio: unexpected output from ffmpeg")
+    channels = 0
+    offset = 12
+    while offset + 8 <= len(buffer):
+        chunk_id = buffer[offset : offset + 4]
+        chunk_size = struct.unpack_from("<I", buffer, offset + 4)[0]
+        if chunk_id == b"fmt ":
+            channels = struct.unpack_from("<H", buffer, offset + 10)[0]
+        elif chunk_id == b"data":
+            return channels, offset + 8
+        offset += 8 + chunk_size + (chunk_size & 1)
+    raise RuntimeError("Failed to decode audio: no audio data found")
+
+
+def decode_audio(data: bytes, file_format: str, sample_rate: int = DEFAULT_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio file into a float32 array of shape (frames, channels) using ffmpeg.
+
+    Inputs are resampled to sample_rate. Mono inputs stay mono, so that they are duplicated
+    to both sides at full level when mixed (same as pydub's set_channels(2)); inputs with
+    more than two channels are downmixed to stereo.
+    """
+    with tempfile.NamedTemporaryFile(suffix=f".{file_format}") as tmp_input:
+        tmp_input.write(data)
+        tmp_input.flush()
+        result = subprocess.run(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-i",
+                tmp_input.name,
+                "-vn",
+                "-af",
+                "aformat=channel_layouts=mono|stereo",
+                "-ar",
+                str(sample_rate),
+                "-acodec",
+                "pcm_f32le",
+                "-f",
+                "wav",
+                "pipe:1",
+            ],
+            capture_output=True,
+            check=False,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {result.stderr.decode(errors='replace').strip()}")
+
+    channels, offset = _parse_wav_stream(result.stdout)
+    frames = (len(result.stdout) - offset) // (4 * channels)
+    return np.frombuffer(result.stdout, dtype="<f4", count=frames * channels, offset=offset).reshape(-1, channels)
+
+
+def decode_audio_files(
+    inputs: list[tuple[bytes, str]],
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    max_workers: int = MAX_DECODE_WORKERS,
+) -> list[np.ndarray]:
+    """
+    Decode (data, file_format) inputs concurrently, returning arrays in the input order.
+    """
+    if len(inputs) <= 1:
+        return [decode_audio(data, file_format, sample_rate) for data, file_format in inputs]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(inputs))) as executor:
+        return list(executor.map(lambda item: decode_audio(item[0], item[1], sample_rate), inputs))
+
+
+def pan_gains(pan: float) -> np.ndarray:
+    """
+    Return (left, right) gains for a constant-power pan law.
+
+    -1.0 is 100% left, 0.0 is center and 1.0 is 100% right. The gains are scaled so that
+    the center position is unity and a hard pan boosts the remaining side by 3dB.
+    """
+    if not -1.0 <= pan <= 1.0:
+        raise ValueError("Panning should be between -1.0 (100% left) and +1.0 (100% right)")
+    angle = (pan + 1.0) * math.pi / 4.0
+    return np.array([math.cos(angle), math.sin(angle)], dtype=np.float32) * np.float32(math.sqrt(2.0))
+
+
+def mix_tracks(tracks: list[np.ndarray], gains: list[np.ndarray], clip: bool = True) -> np.ndarray:
+    """
+    Sum tracks into a single preallocated buffer, applying per-channel gains.
+
+    Tracks may have different lengths; shorter tracks are treated as padded with silence.
+    Mono tracks are broadcast to both channels. The result is clipped to [-1.0, 1.0]
+    unless clip is False (e.g. when the mix is normalized afterwards).
+    """
+    if not tracks:
+        return np.zeros((0, DEFAULT_CHANNELS), dtype=np.float32)
+
+    max_frames = max(len(track) for track in tracks)
+    mixed = np.zeros((max_frames, DEFAULT_CHANNELS), dtype=np.float32)
+    scratch = np.empty_like(mixed)
+    for track, gain in zip(tracks, gains):
+        frames = len(track)
+        np.multiply(track, gain, out=scratch[:frames])
+        mixed[:frames] += scratch[:frames]
+
+    if clip:
+        np.clip(mixed, -1.0, 1.0, out=mixed)
+    return mixed
+
+
+class LoopedAudio:
+    """
+    Endless loop over an audio array, read block by block without materializing repeats.
+
+    With crossfade_frames, the tail of the audio is crossfaded into its head once at the
+    loop seam (equal-power), and every repetition after the first plays the blended seam.
+    Memory stays proportional to the source audio regardless of the rendered length.
+    """
+
+    def __init__(self, samples: np.ndarray, crossfade_frames: int = 0):
+        if len(samples) == 0:
+            raise ValueError("Cannot loop empty audio")
+        crossfade_frames = max(0, min(int(crossfade_frames), len(samples) // 2))
+        self.head_frames = crossfade_frames
+        self.head = samples[:crossfade_frames]
+        if crossfade_frames == 0:
+            self.cycle = samples
+            return
+
+        fade = np.linspace(0.0, math.pi / 2.0, crossfade_frames, dtype=np.float32)[:, np.newaxis]
+        seam = samples[-crossfade_frames:] * np.cos(fade) + samples[:crossfade_frames] * np.sin(fade)
+        # One cycle: everything after the head, with the tail replaced by the blended seam
+        self.cycle = np.concatenate([samples[crossfade_frames:-crossfade_frames], seam])
+
+    def read(self, start_frame: int, frames: int) -> np.ndarray:
+        indices = np.arange(start_frame - self.head_frames, start_frame - self.head_frames + frames)
+        block = np.take(self.cycle, indices, axis=0, mode="wrap")
+        if start_frame < self.head_frames:
+            # The first pass starts with the untouched head of the source audio
+            head_end = min(self.head_frames, start_frame + frames)
+            block[: head_end - start_frame] = self.head[start_frame:head_end]
+        return block
+
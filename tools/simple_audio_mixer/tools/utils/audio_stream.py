@@ -0,0 +1,219 @@
+"""
+Block streaming utilities (ffmpeg decode/encode pipes with bounded memory)
+"""
+
+import struct
+import subprocess
+import tempfile
+
+import numpy as np
+
+from tools.utils.audio_engine import DEFAULT_CHANNELS, DEFAULT_SAMPLE_RATE, mix_tracks
+from tools.utils.output_profile import OutputSettings
+
+STREAM_BLOCK_FRAMES = 65536
+
+
+def _read_stderr(stderr_file) -> str:
+    stderr_file.seek(0)
+    return stderr_file.read().decode(errors="replace").strip()
+
+
+class ArrayReader:
+    """
+    Block reader over an in-memory array, with the same interface as DecodeStream.
+    """
+
+    def __init__(self, samples: np.ndarray):
+        self.samples = samples
+        self.position = 0
+
+    def read(self, frames: int) -> np.ndarray:
+        block = self.samples[self.position : self.position + frames]
+        self.position += len(block)
+        return block
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DecodeStream:
+    """
+    Decode an audio file block by block through an ffmpeg pipe.
+
+    Blocks are float32 arrays of shape (frames, channels) at sample_rate, or at the
+    sample rate of the input if sample_rate is None. As with decode_audio, mono stays
+    mono and more than two channels are downmixed to stereo. A block shorter than
+    requested means the end of the stream.
+    """
+
+    def __init__(self, data: bytes, file_format: str, sample_rate: int | None = DEFAULT_SAMPLE_RATE):
+        self._input = tempfile.NamedTemporaryFile(suffix=f".{file_format}")
+        self._input.write(data)
+        self._input.flush()
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-i",
+                self._input.name,
+                "-vn",
+                "-af",
+                "aformat=channel_layouts=mono|stereo",
+                *(["-ar", str(sample_rate)] if sample_rate else []),
+                "-acodec",
+                "pcm_f32le",
+                "-f",
+                "wav",
+                "pipe:1",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+        )
+        self.channels, self.sample_rate = self._read_header()
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self._process.stdout.read(size)
+        if len(data) < size:
+            self._check_exit()
+            raise RuntimeError("Failed to decode audio: unexpected end of stream")
+        return data
+
+    def _read_header(self) -> tuple[int, int]:
+        riff = self._read_exact(12)
+        if riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise RuntimeError("Failed to decode audio: unexpected output from ffmpeg")
+        channels = sample_rate = 0
+        while True:
+            chunk_id, chunk_size = struct.unpack("<4sI", self._read_exact(8))
+            if chunk_id == b"data":
+                return channels, sample_rate
+            chunk = self._read_exact(chunk_size + (chunk_size & 1))
+            if chunk_id == b"fmt ":
+                channels, sample_rate = struct.unpack_from("<HI", chunk, 2)
+
+    def _check_exit(self) -> None:
+        if self._process.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio: {_read_stderr(self._stderr)}")
+
+    def read(self, frames: int) -> np.ndarray:
+        frame_size = 4 * self.channels
+        data = self._process.stdout.read(frames * frame_size)
+        if len(data) < frames * frame_size:
+            self._check_exit()
+        usable = len(data) - len(data) % frame_size
+        return np.frombuffer(data, dtype="<f4", count=usable // 4).reshape(-1, self.channels)
+
+    def close(self) -> None:
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+        self._stderr.close()
+        self._input.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def probe_sample_rate(data: bytes, file_format: str) -> int:
+    """
+    Return the sample rate of an audio file, read from the header of its decoded stream.
+    """
+    with DecodeStream(data, file_format, sample_rate=None) as stream:
+        return stream.sample_rate
+
+
+class EncodeStream:
+    """
+    Encode float32 blocks through an ffmpeg pipe with an output profile.
+
+    The encoded output is written to a temporary file, since some containers (e.g. WAV)
+    need to seek back and finalize their header.
+    """
+
+    def __init__(self, output: OutputSettings, sample_rate: int = DEFAULT_SAMPLE_RATE, channels: int = DEFAULT_CHANNELS):
+        self._output = tempfile.NamedTemporaryFile(suffix=f".{output.profile.file_extension}")
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "f32le",
+                "-ar",
+                str(sample_rate),
+                "-ac",
+                str(channels),
+                "-i",
+                "pipe:0",
+                *output.encoder_arguments(sample_rate),
+                self._output.name,
+            ],
+            stdin=subprocess.PIPE,
+            stderr=self._stderr,
+        )
+
+    def write(self, block: np.ndarray) -> None:
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(block, dtype="<f4")).cast("B"))
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError(f"Failed to encode audio: {_read_stderr(self._stderr)}")
+
+    def finish(self) -> bytes:
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"Failed to encode audio: {_read_stderr(self._stderr)}")
+        self._output.seek(0)
+        return self._output.read()
+
+    def close(self) -> None:
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        self._stderr.close()
+        self._output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def encode_audio(samples: np.ndarray, output: OutputSettings, sample_rate: int = DEFAULT_SAMPLE_RATE) -> bytes:
+    """
+    Encode a whole (frames, channels) buffer by piping it to the encoder.
+    """
+    with EncodeStream(output, sample_rate, channels=samples.shape[1]) as encoder:
+        encoder.write(samples)
+        return encoder.finish()
+
+
+def iter_mixed_blocks(readers: list, gains: list[np.ndarray], block_frames: int = STREAM_BLOCK_FRAMES):
+    """
+    Yield mixed blocks of all readers until every reader is exhausted.
+    """
+    while True:
+        blocks = [reader.read(block_frames) for reader in readers]
+        if not any(len(block) for block in blocks):
+            return
+        yield mix_tracks(blocks, gains)
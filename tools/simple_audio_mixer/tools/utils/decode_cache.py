@@ -0,0 +1,110 @@
+"""
+Decoded audio cache (memory-mapped .npy files of decoded PCM, reused across invocations)
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from tools.utils.audio_engine import DEFAULT_SAMPLE_RATE, decode_audio
+
+DECODE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "simple_audio_mixer", "decoded")
+DECODE_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Least recently used entries are evicted beyond this size
+DECODE_CACHE_VERSION = 1  # Bump when decode_audio changes its output for the same input
+
+
+def build_decode_cache_key(data: bytes, sample_rate: int) -> str:
+    """
+    Build a cache key from the content hash of the input and the decoding target.
+
+    decode_audio keeps mono as mono and downmixes everything else to stereo, so the
+    channel layout is part of the cache version rather than the key.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{DECODE_CACHE_VERSION}:{sample_rate}\0".encode("utf-8"))
+    digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+class DecodedAudioCache:
+    """
+    Local on-disk cache of decoded audio, bounded in size with LRU eviction.
+
+    Hits are returned as read-only memory-mapped arrays, so loading a cached asset does
+    not copy or decode anything. The modification time of an entry is its last use.
+    """
+
+    def __init__(self, root_dir: str = DECODE_CACHE_DIR, max_bytes: int = DECODE_CACHE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.npy")
+
+    def _load(self, path: str) -> np.ndarray | None:
+        try:
+            samples = np.load(path, mmap_mode="r")
+            os.utime(path)
+            return samples
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # a broken entry is decoded again and overwritten
+            return None
+
+    def _store(self, path: str, samples: np.ndarray) -> None:
+        if samples.nbytes > self.max_bytes:
+            return
+        try:
+            os.makedirs(self.root_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    np.save(tmp_file, samples)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._evict(keep=path)
+        except OSError:
+            # caching is best effort; the decoded audio is still returned
+            return
+
+    def _evict(self, keep: str) -> None:
+        entries = []
+        for name in os.listdir(self.root_dir):
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.root_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError:
+                continue
+
+    def decode(self, data: bytes, file_format: str, sample_rate: int = DEFAULT_SAMPLE_RATE) -> np.ndarray:
+        """
+        Same as decode_audio, but served from the cache when the same input was decoded before.
+        """
+        path = self._path(build_decode_cache_key(data, sample_rate))
+        samples = self._load(path)
+        if samples is not None:
+            return samples
+
+        samples = decode_audio(data, file_format, sample_rate)
+        self._store(path, samples)
+        return samples
@@ -0,0 +1,181 @@
+"""
+ffmpeg filter graph backend (renders mixes in a single ffmpeg process, without PCM in Python)
+"""
+
+import json
+import subprocess
+import tempfile
+from contextlib import ExitStack
+
+import numpy as np
+
+from tools.utils.gain_envelope import BGMMixSettings, build_bgm_envelope
+from tools.utils.output_profile import OutputSettings
+
+ENVELOPE_STEP_SAMPLES = 256  # Granularity of the per-frame volume expression
+
+
+def _run_ffmpeg(arguments: list[str], action: str) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-hide_banner", *arguments],
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to {action}: {result.stderr.decode(errors='replace').strip()}")
+    return result
+
+
+def _write_input(stack: ExitStack, data: bytes, file_format: str) -> str:
+    tmp_input = stack.enter_context(tempfile.NamedTemporaryFile(suffix=f".{file_format}"))
+    tmp_input.write(data)
+    tmp_input.flush()
+    return tmp_input.name
+
+
+def probe_duration_sec(path: str) -> float:
+    """
+    Return the duration of an audio file, using ffprobe if available.
+
+    Falls back to decoding the audio with ffmpeg (without passing PCM to Python) when
+    ffprobe is missing or the container does not report a duration.
+    """
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", path],
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode == 0:
+            return float(json.loads(result.stdout)["format"]["duration"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    result = _run_ffmpeg(
+        ["-loglevel", "error", "-i", path, "-vn", "-f", "null", "-progress", "pipe:1", "-"],
+        "measure audio duration",
+    )
+    durations = [
+        int(line.split("=", 1)[1])
+        for line in result.stdout.decode(errors="replace").splitlines()
+        if line.startswith("out_time_us=") and line.split("=", 1)[1].strip().isdigit()
+    ]
+    if not durations:
+        raise RuntimeError("Failed to measure audio duration")
+    return durations[-1] / 1_000_000
+
+
+def _stereo_filter(left_gain: float, right_gain: float, sample_rate: int) -> str:
+    """
+    Normalize an input to stereo at the mixing sample rate and apply per-channel gains.
+
+    Mono inputs (FC) are sent to both sides at full level, and inputs with more than
+    two channels are downmixed first, same as decode_audio.
+    """
+    return (
+        f"aformat=sample_fmts=flt:sample_rates={sample_rate}:channel_layouts=mono|stereo,"
+        f"pan=stereo|FL={left_gain:.6f}*FL+{left_gain:.6f}*FC|FR={right_gain:.6f}*FR+{right_gain:.6f}*FC"
+    )
+
+
+def envelope_expression(times_ms: np.ndarray, gains: np.ndarray) -> str:
+    """
+    Translate (time_ms, gain) breakpoints into a piecewise-linear ffmpeg expression of t.
+    """
+    expression = f"{gains[-1]:.6f}"
+    for index in range(len(times_ms) - 1, 0, -1):
+        start_sec = times_ms[index - 1] / 1000.0
+        end_sec = times_ms[index] / 1000.0
+        if end_sec <= start_sec:
+            continue
+        start_gain = gains[index - 1]
+        slope = (gains[index] - start_gain) / (end_sec - start_sec)
+        expression = f"if(lt(t,{end_sec:.6f}),{start_gain:.6f}+{slope:.6f}*(t-{start_sec:.6f}),{expression})"
+    return expression
+
+
+def _render(input_arguments: list[str], filter_graph: str, output: OutputSettings, sample_rate: int) -> bytes:
+    with tempfile.NamedTemporaryFile(suffix=f".{output.profile.file_extension}") as tmp_output:
+        _run_ffmpeg(
+            [
+                "-loglevel",
+                "error",
+                *input_arguments,
+                "-filter_complex",
+                filter_graph,
+                "-map",
+                "[out]",
+                *output.encoder_arguments(sample_rate),
+                "-y",
+                tmp_output.name,
+            ],
+            "render audio",
+        )
+        tmp_output.seek(0)
+        return tmp_output.read()
+
+
+def render_stereo_mix_ffmpeg(
+    inputs: list[tuple[bytes, str]],
+    gains: list[np.ndarray],
+    output: OutputSettings,
+    sample_rate: int,
+) -> bytes:
+    """
+    Mix (data, file_format) inputs with per-channel gains in a single ffmpeg filter graph.
+    """
+    with ExitStack() as stack:
+        input_arguments: list[str] = []
+        chains: list[str] = []
+        for index, ((data, file_format), gain) in enumerate(zip(inputs, gains)):
+            input_arguments += ["-i", _write_input(stack, data, file_format)]
+            chains.append(f"[{index}:a]{_stereo_filter(float(gain[0]), float(gain[1]), sample_rate)}[t{index}]")
+
+        labels = "".join(f"[t{index}]" for index in range(len(inputs)))
+        # Quantizing to 16-bit at the end clips the sum, same as the NumPy engine
+        chains.append(
+            f"{labels}amix=inputs={len(inputs)}:duration=longest:normalize=0,"
+            "aformat=sample_fmts=s16:channel_layouts=stereo[out]"
+        )
+        return _render(input_arguments, ";".join(chains), output, sample_rate)
+
+
+def render_bgm_mix_ffmpeg(
+    voice: tuple[bytes, str],
+    bgm: tuple[bytes, str],
+    settings: BGMMixSettings,
+    output: OutputSettings,
+    sample_rate: int,
+) -> bytes:
+    """
+    Render the BGM mix in a single ffmpeg filter graph.
+
+    The BGM is looped by the demuxer (-stream_loop), the gain envelope is evaluated by the
+    volume filter, and the voice is delayed by the intro duration and mixed with amix.
+    """
+    if settings.loop_crossfade_ms:
+        raise ValueError("BGM loop crossfade is not supported in the ffmpeg render mode")
+    if settings.auto_ducking:
+        raise ValueError("Auto-ducking is not supported in the ffmpeg render mode")
+
+    with ExitStack() as stack:
+        voice_path = _write_input(stack, *voice)
+        bgm_path = _write_input(stack, *bgm)
+
+        voice_ms = probe_duration_sec(voice_path) * 1000.0
+        total_sec = (settings.intro_duration_ms + voice_ms + settings.outro_duration_ms) / 1000.0
+        times_ms, gains = build_bgm_envelope(settings, voice_ms)
+        voice_gain = settings.voice_volume_ratio * settings.master_volume_ratio
+
+        filter_graph = ";".join(
+            [
+                f"[0:a]{_stereo_filter(1.0, 1.0, sample_rate)},atrim=end={total_sec:.6f},"
+                f"asetnsamples=n={ENVELOPE_STEP_SAMPLES}:p=0,"
+                f"volume=eval=frame:volume='{envelope_expression(times_ms, gains)}'[bgm]",
+                f"[1:a]{_stereo_filter(voice_gain, voice_gain, sample_rate)},"
+                f"adelay=delays={settings.intro_duration_ms:.3f}:all=1[voice]",
+                "[bgm][voice]amix=inputs=2:duration=first:normalize=0,"
+                "aformat=sample_fmts=s16:channel_layouts=stereo[out]",
+            ]
+        )
+        return _render(["-stream_loop", "-1", "-i", bgm_path, "-i", voice_path], filter_graph, output, sample_rate)
@@ -0,0 +1,299 @@
+"""
+Gain envelope utilities (piecewise-linear gain rendering for the BGM mixer)
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from tools.utils.audio_engine import DEFAULT_CHANNELS, LoopedAudio
+from tools.utils.audio_stream import ArrayReader
+
+RENDER_BLOCK_FRAMES = 65536
+
+# Auto-ducking
+DUCKING_FRAME_SAMPLES = 512  # Analysis frame size for the voice RMS envelope
+DUCKING_THRESHOLD_DB = -40  # Voice frames louder than this are treated as speech
+
+
+@dataclass(frozen=True)
+class BGMMixSettings:
+    # durations (ms)
+    intro_fadein_ms: float = 100
+    intro_play_ms: float = 5000
+    intro_fadeout_ms: float = 1000
+    pre_voice_delay_ms: float = 500
+    post_voice_delay_ms: float = 1000
+    outro_fadein_ms: float = 1000
+    outro_play_ms: float = 5000
+    outro_fadeout_ms: float = 5000
+    loop_crossfade_ms: float = 0
+    # volume ratios
+    voice_volume_ratio: float = 1.0
+    bgm_intro_volume_ratio: float = 1.0
+    bgm_during_voice_volume_ratio: float = 0.2
+    bgm_outro_volume_ratio: float = 1.0
+    master_volume_ratio: float = 1.0
+    # auto-ducking
+    auto_ducking: bool = False
+    bgm_voice_pause_volume_ratio: float = 0.5
+    ducking_attack_ms: float = 50
+    ducking_release_ms: float = 500
+
+    @classmethod
+    def from_tool_parameters(cls, tool_parameters: dict[str, Any]) -> "BGMMixSettings":
+        defaults = cls()
+        return cls(
+            intro_fadein_ms=tool_parameters.get("a_bgm_intro_fadein_ms", defaults.intro_fadein_ms),
+            intro_play_ms=tool_parameters.get("b_bgm_intro_play_ms", defaults.intro_play_ms),
+            intro_fadeout_ms=tool_parameters.get("c_bgm_intro_fadeout_ms", defaults.intro_fadeout_ms),
+            pre_voice_delay_ms=tool_parameters.get("d_bgm_pre_voice_delay_ms", defaults.pre_voice_delay_ms),
+            post_voice_delay_ms=tool_parameters.get("e_bgm_post_voice_delay_ms", defaults.post_voice_delay_ms),
+            outro_fadein_ms=tool_parameters.get("f_bgm_outro_fadein_ms", defaults.outro_fadein_ms),
+            outro_play_ms=tool_parameters.get("g_bgm_outro_play_ms", defaults.outro_play_ms),
+            outro_fadeout_ms=tool_parameters.get("h_bgm_outro_fadeout_ms", defaults.outro_fadeout_ms),
+            loop_crossfade_ms=tool_parameters.get("m_bgm_loop_crossfade_ms") or defaults.loop_crossfade_ms,
+            voice_volume_ratio=tool_parameters.get("i_voice_volume_ratio", defaults.voice_volume_ratio),
+            bgm_intro_volume_ratio=tool_parameters.get("j_bgm_intro_volume_ratio", defaults.bgm_intro_volume_ratio),
+            bgm_during_voice_volume_ratio=tool_parameters.get(
+                "k_bgm_during_voice_volume_ratio", defaults.bgm_during_voice_volume_ratio
+            ),
+            bgm_outro_volume_ratio=tool_parameters.get("l_bgm_outro_volume_ratio", defaults.bgm_outro_volume_ratio),
+            master_volume_ratio=tool_parameters.get("z_master_volume_ratio", defaults.master_volume_ratio),
+            auto_ducking=bool(tool_parameters.get("n_auto_ducking", defaults.auto_ducking)),
+            bgm_voice_pause_volume_ratio=tool_parameters.get(
+                "o_bgm_voice_pause_volume_ratio", defaults.bgm_voice_pause_volume_ratio
+            ),
+            ducking_attack_ms=tool_parameters.get("p_ducking_attack_ms", defaults.ducking_attack_ms),
+            ducking_release_ms=tool_parameters.get("q_ducking_release_ms", defaults.ducking_release_ms),
+        )
+
+    @property
+    def intro_duration_ms(self) -> float:
+        return self.intro_fadein_ms + self.intro_play_ms + self.intro_fadeout_ms + self.pre_voice_delay_ms
+
+    @property
+    def outro_duration_ms(self) -> float:
+        return self.post_voice_delay_ms + self.outro_fadein_ms + self.outro_play_ms + self.outro_fadeout_ms
+
+
+@dataclass(frozen=True)
+class DuckingCurve:
+    # (time_ms relative to the voice start, gain) breakpoints of the BGM level during the voice
+    times_ms: np.ndarray
+    gains: np.ndarray
+    voice_ms: float
+
+
+def measure_frame_rms(reader, frame_samples: int = DUCKING_FRAME_SAMPLES) -> tuple[np.ndarray, int]:
+    """
+    Measure the RMS of each analysis frame of a reader (ArrayReader or DecodeStream).
+
+    Returns the per-frame RMS and the total number of frames read. Only the per-frame
+    values are kept, so a DecodeStream can be analyzed with bounded memory.
+    """
+    block_frames = (RENDER_BLOCK_FRAMES // frame_samples) * frame_samples
+    values: list[np.ndarray] = []
+    total_frames = 0
+    while True:
+        block = reader.read(block_frames)
+        total_frames += len(block)
+        if len(block):
+            padded_frames = -(-len(block) // frame_samples) * frame_samples
+            if padded_frames != len(block):
+                block = np.concatenate([block, np.zeros((padded_frames - len(block), block.shape[1]), block.dtype)])
+            frames = block.reshape(-1, frame_samples * block.shape[1])
+            values.append(np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)))
+        if len(block) < block_frames:
+            break
+    return (np.concatenate(values) if values else np.zeros(0)), total_frames
+
+
+def build_ducking_curve(
+    frame_rms: np.ndarray,
+    voice_frames: int,
+    settings: BGMMixSettings,
+    sample_rate: int,
+    frame_samples: int = DUCKING_FRAME_SAMPLES,
+) -> DuckingCurve:
+    """
+    Derive the BGM level during the voice from the voice RMS envelope.
+
+    Each analysis frame targets the during-voice level while the voice speaks and the
+    voice-pause level otherwise. The level moves toward the target with the attack time
+    when decreasing and the release time when increasing, and returns to the during-voice
+    level after the voice ends.
+    """
+    frame_ms = frame_samples * 1000.0 / sample_rate
+    during = settings.bgm_during_voice_volume_ratio
+    paused = settings.bgm_voice_pause_volume_ratio
+
+    threshold = 10 ** (DUCKING_THRESHOLD_DB / 20)
+    tail_frames = int(settings.post_voice_delay_ms // frame_ms)
+    targets = np.where(frame_rms > threshold, during, paused)
+    targets = np.concatenate([targets, np.full(tail_frames, during)])
+
+    attack = np.exp(-frame_ms / max(settings.ducking_attack_ms, frame_ms))
+    release = np.exp(-frame_ms / max(settings.ducking_release_ms, frame_ms))
+    gains = np.empty(len(targets) + 1)
+    gains[0] = level = during
+    for index, target in enumerate(targets.tolist(), start=1):
+        coefficient = attack if target < level else release
+        level = target + (level - target) * coefficient
+        gains[index] = level
+
+    times_ms = np.arange(len(gains)) * frame_ms
+    return DuckingCurve(times_ms=times_ms, gains=gains, voice_ms=voice_frames * 1000.0 / sample_rate)
+
+
+def analyze_ducking(reader, settings: BGMMixSettings, sample_rate: int) -> DuckingCurve:
+    """
+    Build the ducking curve from a voice reader in one analysis pass.
+    """
+    frame_rms, voice_frames = measure_frame_rms(reader)
+    return build_ducking_curve(frame_rms, voice_frames, settings, sample_rate)
+
+
+def build_bgm_envelope(
+    settings: BGMMixSettings,
+    voice_ms: float,
+    ducking: DuckingCurve | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compile the BGM timing and volume settings into (time_ms, gain) breakpoints.
+
+    Fades are linear in amplitude, the same as pydub's fade(). The master volume is
+    folded into the gains. With a ducking curve, the level between the intro fade-out
+    and the outro fade-in follows the curve instead of the flat during-voice level.
+    """
+    intro = settings.bgm_intro_volume_ratio
+    during = settings.bgm_during_voice_volume_ratio
+    outro = settings.bgm_outro_volume_ratio
+
+    points = [(0.0, 0.0)]
+
+    def add(duration_ms: float, gain: float) -> None:
+        points.append((points[-1][0] + duration_ms, gain))
+
+    add(settings.intro_fadein_ms, intro)
+    add(settings.intro_play_ms, intro)
+    add(settings.intro_fadeout_ms, during)
+    if ducking is None:
+        add(settings.pre_voice_delay_ms + voice_ms + settings.post_voice_delay_ms, during)
+    else:
+        add(settings.pre_voice_delay_ms, during)
+        voice_start_ms = points[-1][0]
+        plateau_ms = voice_ms + settings.post_voice_delay_ms
+        count = int(np.searchsorted(ducking.times_ms, plateau_ms, side="right"))
+        points.extend(zip((voice_start_ms + ducking.times_ms[:count]).tolist(), ducking.gains[:count].tolist()))
+        points.append((voice_start_ms + plateau_ms, during))
+    add(settings.outro_fadein_ms, outro)
+    add(settings.outro_play_ms, outro)
+    add(settings.outro_fadeout_ms, 0.0)
+
+    times, gains = zip(*points)
+    return np.array(times, dtype=np.float64), np.array(gains, dtype=np.float64) * settings.master_volume_ratio
+
+
+def render_gain(
+    envelope: tuple[np.ndarray, np.ndarray],
+    start_frame: int,
+    frames: int,
+    sample_rate: int,
+) -> np.ndarray:
+    """
+    Render the envelope as per-frame gains for frames [start_frame, start_frame + frames).
+    """
+    times, gains = envelope
+    frame_ms = (np.arange(start_frame, start_frame + frames, dtype=np.float64) * 1000.0) / sample_rate
+    return np.interp(frame_ms, times, gains).astype(np.float32)
+
+
+def ms_to_frames(duration_ms: float, sample_rate: int) -> int:
+    return int(round(duration_ms * sample_rate / 1000.0))
+
+
+def iter_bgm_mix_blocks(
+    voice_reader,
+    bgm: np.ndarray,
+    settings: BGMMixSettings,
+    sample_rate: int,
+    block_frames: int = RENDER_BLOCK_FRAMES,
+    ducking: DuckingCurve | None = None,
+    clip: bool = True,
+):
+    """
+    Yield (start_frame, block) pairs of BGM rendered with the gain envelope and the voice.
+
+    The voice is pulled from voice_reader block by block (an ArrayReader or a DecodeStream),
+    so its length does not need to be known in advance: until the voice ends, the envelope
+    is built with the voice extending past the current block, which only differs from the
+    final envelope after the voice end. The BGM is looped lazily and combined with the voice
+    with a single multiply-add per block. Blocks are clipped to [-1.0, 1.0] unless clip is False.
+
+    A ducking curve carries the voice length, so the envelope is built once up front.
+    """
+    voice_start = ms_to_frames(settings.intro_duration_ms, sample_rate)
+    voice_gain = np.float32(settings.voice_volume_ratio * settings.master_volume_ratio)
+    looped_bgm = LoopedAudio(bgm, crossfade_frames=ms_to_frames(settings.loop_crossfade_ms, sample_rate))
+
+    voice_read = 0
+    voice_frames = None
+    total_frames = None
+    block_start = 0
+    envelope = build_bgm_envelope(settings, ducking.voice_ms, ducking) if ducking is not None else None
+    while total_frames is None or block_start < total_frames:
+        block_end = block_start + block_frames
+        voice_block = None
+        if voice_frames is None and block_end > voice_start:
+            requested = block_end - max(block_start, voice_start)
+            voice_block = voice_reader.read(requested)
+            voice_read += len(voice_block)
+            if len(voice_block) < requested:
+                voice_frames = voice_read
+
+        if voice_frames is None:
+            voice_ms = max(0, block_end - voice_start) * 1000.0 / sample_rate
+        else:
+            voice_ms = voice_frames * 1000.0 / sample_rate
+            total_frames = ms_to_frames(settings.intro_duration_ms + voice_ms + settings.outro_duration_ms, sample_rate)
+            block_end = min(block_end, total_frames)
+            if block_start >= block_end:
+                return
+
+        if ducking is None:
+            envelope = build_bgm_envelope(settings, voice_ms)
+        gain = render_gain(envelope, block_start, block_end - block_start, sample_rate)
+        block = looped_bgm.read(block_start, block_end - block_start) * gain[:, np.newaxis]
+        if block.shape[1] != DEFAULT_CHANNELS:
+            block = np.broadcast_to(block, (len(block), DEFAULT_CHANNELS)).copy()
+
+        if voice_block is not None and len(voice_block):
+            offset = max(block_start, voice_start) - block_start
+            block[offset : offset + len(voice_block)] += voice_block * voice_gain
+
+        if clip:
+            np.clip(block, -1.0, 1.0, out=block)
+        yield block_start, block
+        block_start = block_end
+
+
+def render_bgm_mix(
+    voice: np.ndarray,
+    bgm: np.ndarray,
+    settings: BGMMixSettings,
+    sample_rate: int,
+    ducking: DuckingCurve | None = None,
+    clip: bool = True,
+) -> np.ndarray:
+    """
+    Render BGM with the gain envelope and the voice into one preallocated stereo buffer.
+    """
+    voice_ms = len(voice) * 1000.0 / sample_rate
+    total_frames = ms_to_frames(settings.intro_duration_ms + voice_ms + settings.outro_duration_ms, sample_rate)
+    mixed = np.empty((total_frames, DEFAULT_CHANNELS), dtype=np.float32)
+    blocks = iter_bgm_mix_blocks(ArrayReader(voice), bgm, settings, sample_rate, ducking=ducking, clip=clip)
+    for block_start, block in blocks:
+        mixed[block_start : block_start + len(block)] = block
+    return mixed
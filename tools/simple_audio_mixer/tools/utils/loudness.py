@@ -0,0 +1,191 @@
+"""
+Loudness normalization (ITU-R BS.1770 integrated loudness and a true-peak limiter)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+# K-weighting biquads (b, a) as specified for 48 kHz in ITU-R BS.1770
+K_WEIGHTING_SHELF = ((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585))
+K_WEIGHTING_HIGHPASS = ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621))
+K_WEIGHTING_REFERENCE_RATE = 48000
+
+GATE_BLOCK_STEPS = 4  # 400 ms gating blocks made of 100 ms steps (75% overlap)
+GATE_STEP_SEC = 0.1
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+ANALYSIS_CHUNK_STEPS = 600  # Steps transformed at once, to bound the FFT memory
+
+TRUE_PEAK_OVERSAMPLING = 4
+TRUE_PEAK_HALF_TAPS = 6
+LIMITER_CHUNK_FRAMES = 256  # Granularity (and lookahead) of the limiter gain
+LIMITER_RELEASE_MS = 100
+DEFAULT_TRUE_PEAK_LIMIT_DBTP = -1.0
+
+
+def _biquad_power(coefficients: tuple, omega: np.ndarray) -> np.ndarray:
+    b, a = coefficients
+    z = np.exp(-1j * omega)
+    return np.abs((b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)) ** 2
+
+
+def k_weighting_power(frequencies: np.ndarray) -> np.ndarray:
+    """
+    Return the power response of the K-weighting filter at the given frequencies (Hz).
+    """
+    omega = 2.0 * math.pi * frequencies / K_WEIGHTING_REFERENCE_RATE
+    return _biquad_power(K_WEIGHTING_SHELF, omega) * _biquad_power(K_WEIGHTING_HIGHPASS, omega)
+
+
+def integrated_loudness(samples: np.ndarray, sample_rate: int) -> float:
+    """
+    Measure the gated integrated loudness (LUFS) of a (frames, channels) array.
+
+    The K-weighting is applied in the frequency domain of each 100 ms step, and each
+    400 ms gating block is the mean of four consecutive steps. Returns -inf when every
+    block is below the absolute gate.
+    """
+    step_frames = int(round(sample_rate * GATE_STEP_SEC))
+    steps = len(samples) // step_frames
+    if steps < GATE_BLOCK_STEPS:
+        return -math.inf
+
+    # Parseval weights of one-sided spectra, with the K-weighting folded in
+    weights = k_weighting_power(np.fft.rfftfreq(step_frames, 1.0 / sample_rate))
+    weights[1 : (step_frames + 1) // 2] *= 2.0
+    weights /= step_frames * step_frames
+
+    step_power = np.empty(steps)
+    for start in range(0, steps, ANALYSIS_CHUNK_STEPS):
+        end = min(start + ANALYSIS_CHUNK_STEPS, steps)
+        chunk = samples[start * step_frames : end * step_frames].reshape(end - start, step_frames, -1)
+        spectrum = np.fft.rfft(chunk, axis=1)
+        # channels are summed with unity weights (front left/right/center)
+        step_power[start:end] = np.einsum("sfc,f->s", np.abs(spectrum) ** 2, weights)
+
+    window = np.lib.stride_tricks.sliding_window_view(step_power, GATE_BLOCK_STEPS)
+    block_power = window.mean(axis=1)
+    with np.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10.0 * np.log10(block_power)
+
+    gated = block_power[block_loudness > ABSOLUTE_GATE_LUFS]
+    if not len(gated):
+        return -math.inf
+    relative_gate = -0.691 + 10.0 * math.log10(gated.mean()) + RELATIVE_GATE_LU
+    gated = block_power[block_loudness > max(ABSOLUTE_GATE_LUFS, relative_gate)]
+    return -0.691 + 10.0 * math.log10(gated.mean())
+
+
+def _interpolation_taps() -> list[np.ndarray]:
+    taps = np.arange(-TRUE_PEAK_HALF_TAPS, TRUE_PEAK_HALF_TAPS, dtype=np.float64)
+    phases = []
+    for phase in range(1, TRUE_PEAK_OVERSAMPLING):
+        offset = taps + phase / TRUE_PEAK_OVERSAMPLING
+        window = np.cos(math.pi * offset / (2 * TRUE_PEAK_HALF_TAPS)) ** 2
+        phases.append((np.sinc(offset) * window).astype(np.float32))
+    return phases
+
+
+def true_peak_envelope(samples: np.ndarray) -> np.ndarray:
+    """
+    Return the absolute peak of each frame across channels, including the inter-sample
+    peaks found by 4x oversampling (windowed-sinc polyphase interpolation).
+    """
+    peaks = np.abs(samples).max(axis=1)
+    for taps in _interpolation_taps():
+        for channel in range(samples.shape[1]):
+            # full[n + HALF_TAPS] is the interpolated value between frames n and n + 1
+            interpolated = np.convolve(samples[:, channel], taps)
+            np.maximum(
+                peaks,
+                np.abs(interpolated[TRUE_PEAK_HALF_TAPS : TRUE_PEAK_HALF_TAPS + len(samples)]),
+                out=peaks,
+            )
+    return peaks
+
+
+def limit_true_peak(samples: np.ndarray, ceiling_dbtp: float, sample_rate: int) -> np.ndarray:
+    """
+    Apply a lookahead peak limiter so that the true peak stays at or below the ceiling.
+
+    The gain is computed per chunk of frames, looking one chunk ahead and behind, and
+    interpolated linearly between chunk centers, so it never exceeds the gain required
+    by any frame. The gain recovers toward unity with the release time.
+    """
+    ceiling = 10.0 ** (ceiling_dbtp / 20.0)
+    peaks = true_peak_envelope(samples)
+    chunks = -(-len(peaks) // LIMITER_CHUNK_FRAMES)
+    padded = np.zeros(chunks * LIMITER_CHUNK_FRAMES, dtype=peaks.dtype)
+    padded[: len(peaks)] = peaks
+    required = np.minimum(1.0, ceiling / np.maximum(padded.reshape(chunks, -1).max(axis=1), 1e-12))
+    if required.min() >= 1.0:
+        return samples
+
+    target = required.copy()
+    np.minimum(target[1:], required[:-1], out=target[1:])
+    np.minimum(target[:-1], required[1:], out=target[:-1])
+
+    release = math.exp(-LIMITER_CHUNK_FRAMES * 1000.0 / (sample_rate * LIMITER_RELEASE_MS))
+    chunk_gains = np.empty(chunks)
+    gain = 1.0
+    for index, limit in enumerate(target.tolist()):
+        gain = min(limit, 1.0 - (1.0 - gain) * release)
+        chunk_gains[index] = gain
+
+    centers = (np.arange(chunks) + 0.5) * LIMITER_CHUNK_FRAMES
+    frame_gains = np.interp(np.arange(len(samples)), centers, chunk_gains).astype(np.float32)
+    return samples * frame_gains[:, np.newaxis]
+
+
+def normalize_loudness(
+    samples: np.ndarray,
+    sample_rate: int,
+    target_lufs: float,
+    true_peak_dbtp: float,
+) -> np.ndarray:
+    """
+    Scale a mix to the target integrated loudness, then limit its true peak.
+
+    Silent input (below the absolute gate) is returned unchanged. The result is clipped
+    to [-1.0, 1.0] as the final safety net for the sample peaks.
+    """
+    loudness = integrated_loudness(samples, sample_rate)
+    if not math.isfinite(loudness):
+        return samples
+    normalized = samples * np.float32(10.0 ** ((target_lufs - loudness) / 20.0))
+    normalized = limit_true_peak(normalized, true_peak_dbtp, sample_rate)
+    return np.clip(normalized, -1.0, 1.0)
+
+
+@dataclass(frozen=True)
+class LoudnessSettings:
+    target_lufs: float | None = None  # None disables the normalization
+    true_peak_limit_dbtp: float = DEFAULT_TRUE_PEAK_LIMIT_DBTP
+
+    @classmethod
+    def from_tool_parameters(cls, tool_parameters: dict[str, Any]) -> "LoudnessSettings":
+        target_lufs = tool_parameters.get("loudness_target_lufs")
+        true_peak_limit_dbtp = tool_parameters.get("true_peak_limit_dbtp")
+        if target_lufs is not None and (tool_parameters.get("render_mode") or "memory") != "memory":
+            raise ValueError("Loudness normalization is only supported in the memory render mode")
+        return cls(
+            target_lufs=float(target_lufs) if target_lufs is not None else None,
+            true_peak_limit_dbtp=(
+                float(true_peak_limit_dbtp) if true_peak_limit_dbtp is not None else DEFAULT_TRUE_PEAK_LIMIT_DBTP
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_lufs is not None
+
+    def apply(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Normalize a mix when enabled; otherwise return it unchanged.
+        """
+        if not self.enabled:
+            return samples
+        return normalize_loudness(samples, sample_rate, self.target_lufs, self.true_peak_limit_dbtp)
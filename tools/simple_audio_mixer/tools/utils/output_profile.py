@@ -0,0 +1,79 @@
+"""
+Output encoder profiles (codec, container, sample rate, channels and bitrate of mixer outputs)
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from tools.utils.audio_engine import DEFAULT_CHANNELS, DEFAULT_SAMPLE_RATE
+
+NATIVE_SAMPLE_RATE = "native"
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    file_extension: str
+    mime_type: str
+    codec_arguments: tuple[str, ...]
+    default_bitrate_kbps: int | None = None  # None for lossless and quality-based (VBR) profiles
+    sample_rates: tuple[int, ...] | None = None  # Rates the encoder accepts, if restricted
+
+
+ENCODER_PROFILES = {
+    "wav": EncoderProfile("wav", "audio/wav", ("-acodec", "pcm_s16le", "-f", "wav")),
+    "mp3": EncoderProfile("mp3", "audio/mpeg", ("-acodec", "libmp3lame", "-f", "mp3"), default_bitrate_kbps=160),
+    "mp3_vbr": EncoderProfile("mp3", "audio/mpeg", ("-acodec", "libmp3lame", "-q:a", "2", "-f", "mp3")),
+    "flac": EncoderProfile("flac", "audio/flac", ("-acodec", "flac", "-sample_fmt", "s16", "-f", "flac")),
+    "aac": EncoderProfile("m4a", "audio/mp4", ("-acodec", "aac", "-f", "ipod"), default_bitrate_kbps=128),
+    "opus": EncoderProfile(
+        "ogg",
+        "audio/ogg",
+        ("-acodec", "libopus", "-f", "ogg"),
+        default_bitrate_kbps=96,
+        sample_rates=(48000, 24000, 16000, 12000, 8000),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class OutputSettings:
+    output_format: str = "mp3"
+    sample_rate: int | None = DEFAULT_SAMPLE_RATE  # None keeps the sample rate of the input
+    channels: int = DEFAULT_CHANNELS
+    bitrate_kbps: int | None = None  # None uses the default of the profile
+
+    def __post_init__(self):
+        if self.output_format not in ENCODER_PROFILES:
+            raise ValueError(f"Unsupported output format: {self.output_format}")
+        if self.channels not in (1, 2):
+            raise ValueError(f"Unsupported number of output channels: {self.channels}")
+
+    @classmethod
+    def from_tool_parameters(cls, tool_parameters: dict[str, Any]) -> "OutputSettings":
+        sample_rate = str(tool_parameters.get("output_sample_rate") or DEFAULT_SAMPLE_RATE)
+        bitrate_kbps = tool_parameters.get("output_bitrate_kbps")
+        return cls(
+            output_format=tool_parameters.get("output_format") or "mp3",
+            sample_rate=None if sample_rate == NATIVE_SAMPLE_RATE else int(sample_rate),
+            channels=1 if tool_parameters.get("output_channels") == "mono" else DEFAULT_CHANNELS,
+            bitrate_kbps=int(bitrate_kbps) if bitrate_kbps else None,
+        )
+
+    @property
+    def profile(self) -> EncoderProfile:
+        return ENCODER_PROFILES[self.output_format]
+
+    def encoder_arguments(self, sample_rate: int) -> list[str]:
+        """
+        Return the ffmpeg output arguments to encode audio mixed at sample_rate.
+
+        Audio is only resampled when the encoder does not accept the mixing rate (e.g. Opus).
+        """
+        profile = self.profile
+        if profile.sample_rates and sample_rate not in profile.sample_rates:
+            sample_rate = profile.sample_rates[0]
+        arguments = ["-ar", str(sample_rate), "-ac", str(self.channels), *profile.codec_arguments]
+        bitrate_kbps = self.bitrate_kbps or profile.default_bitrate_kbps
+        if bitrate_kbps and profile.default_bitrate_kbps:
+            arguments += ["-b:a", f"{bitrate_kbps}k"]
+        return arguments
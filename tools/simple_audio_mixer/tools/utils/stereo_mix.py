@@ -0,0 +1,59 @@
+"""
+Stereo mix of several audio files with per-file panning and volume, shared by the stereo and multitrack mixers
+"""
+
+from contextlib import ExitStack
+from typing import Any
+
+from tools.utils.audio_engine import decode_audio_files, mix_tracks, pan_gains
+from tools.utils.audio_stream import DecodeStream, EncodeStream, encode_audio, iter_mixed_blocks, probe_sample_rate
+from tools.utils.ffmpeg_render import render_stereo_mix_ffmpeg
+from tools.utils.loudness import LoudnessSettings
+from tools.utils.output_profile import OutputSettings
+
+
+def mix_audio_files(
+    audio_files: list, pannings: list[float], volume_ratios: list[float], tool_parameters: dict[str, Any]
+) -> tuple[bytes, str]:
+    """
+    Mix audio files (dify_plugin File objects) into one encoded stereo blob and return it with its mime type.
+
+    pannings and volume_ratios hold at least one value per file. Output format, render mode and
+    loudness normalization are read from the tool parameters the mixers have in common.
+    """
+    output = OutputSettings.from_tool_parameters(tool_parameters)
+    render_mode = tool_parameters.get("render_mode") or "memory"
+    loudness = LoudnessSettings.from_tool_parameters(tool_parameters)
+
+    # compute per-channel gains from volume ratio and panning
+    gains = [volume_ratios[idx] * pan_gains(pannings[idx]) for idx in range(len(audio_files))]
+    inputs = [(file.blob, file.extension.lstrip(".")) for file in audio_files]
+
+    # mix at the output sample rate, or at the highest rate of the inputs in the native mode
+    sample_rate = output.sample_rate or max(probe_sample_rate(*item) for item in inputs)
+
+    if render_mode == "ffmpeg":
+        # render the whole mix in a single ffmpeg filter graph
+        blob = render_stereo_mix_ffmpeg(inputs, gains, output, sample_rate)
+    elif render_mode == "streaming":
+        # decode, mix and encode block by block through ffmpeg pipes
+        with ExitStack() as stack:
+            readers = [
+                stack.enter_context(DecodeStream(data, file_format, sample_rate)) for data, file_format in inputs
+            ]
+            encoder = stack.enter_context(EncodeStream(output, sample_rate))
+            for block in iter_mixed_blocks(readers, gains):
+                encoder.write(block)
+            blob = encoder.finish()
+    else:
+        # 1) decode audio files concurrently; each decode runs in its own ffmpeg process
+        tracks = decode_audio_files(inputs, sample_rate)
+
+        # 2) mix all tracks in a single pass; shorter tracks are padded with silence
+        mixed = mix_tracks(tracks, gains, clip=not loudness.enabled)
+        mixed = loudness.apply(mixed, sample_rate)
+
+        # 3) pipe the mixed buffer to the encoder
+        blob = encode_audio(mixed, output, sample_rate)
+
+    return blob, output.profile.mime_type
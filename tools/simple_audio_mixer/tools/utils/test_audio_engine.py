@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+import pytest
+
+from tools.utils import audio_engine
+from tools.utils.audio_engine import LoopedAudio, decode_audio_files, mix_tracks, pan_gains
+
+
+def test_pan_gains_matches_center_and_extremes():
+    np.testing.assert_allclose(pan_gains(0.0), [1.0, 1.0], rtol=1e-6)
+    np.testing.assert_allclose(pan_gains(-1.0), [np.sqrt(2.0), 0.0], atol=1e-6)
+    np.testing.assert_allclose(pan_gains(1.0), [0.0, np.sqrt(2.0)], atol=1e-6)
+
+
+def test_pan_gains_is_constant_power():
+    for pan in (-0.8, -0.3, 0.5):
+        assert float(np.sum(pan_gains(pan) ** 2)) == pytest.approx(2.0, rel=1e-6)
+
+
+def test_pan_gains_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        pan_gains(1.5)
+
+
+def test_mix_tracks_pads_broadcasts_and_clips():
+    stereo = np.full((4, 2), 0.5, dtype=np.float32)
+    mono = np.full((2, 1), 0.4, dtype=np.float32)
+    mixed = mix_tracks([stereo, mono], [np.array([1.0, 1.0]), np.array([2.0, 0.5])])
+    np.testing.assert_allclose(mixed, [[1.0, 0.7], [1.0, 0.7], [0.5, 0.5], [0.5, 0.5]], rtol=1e-6)
+
+
+def test_looped_audio_wraps_without_materializing():
+    source = np.arange(4, dtype=np.float32)[:, np.newaxis]
+    looped = LoopedAudio(source)
+    assert looped.read(2, 7)[:, 0].tolist() == [2, 3, 0, 1, 2, 3, 0]
+    assert looped.cycle is source
+
+
+def test_looped_audio_crossfades_seam_after_first_pass():
+    source = np.arange(10, dtype=np.float32)[:, np.newaxis]
+    looped = LoopedAudio(source, crossfade_frames=2)
+    first_pass = looped.read(0, 10)[:, 0]
+    assert first_pass[:8].tolist() == [0, 1, 2, 3, 4, 5, 6, 7]
+    # The tail fades out toward the head, then playback continues after the head
+    np.testing.assert_allclose(first_pass[8:], [8.0, 9 * np.cos(np.pi / 2) + 1 * np.sin(np.pi / 2)], atol=1e-5)
+    assert looped.read(10, 3)[:, 0].tolist() == [2, 3, 4]
+    assert len(looped.cycle) == 8
+
+
+def test_decode_audio_files_keeps_input_order(monkeypatch):
+    def fake_decode(data, file_format, sample_rate):
+        time.sleep(0.01 * (5 - len(data)))  # later inputs finish first
+        return np.full((len(data), 1), len(data), dtype=np.float32)
+
+    monkeypatch.setattr(audio_engine, "decode_audio", fake_decode)
+    tracks = decode_audio_files([(b"x" * size, "wav") for size in range(1, 5)])
+    assert [int(track[0, 0]) for track in tracks] == [1, 2, 3, 4]
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+
+from tools.utils import decode_cache
+from tools.utils.decode_cache import DecodedAudioCache
+
+
+def _fake_decoder(monkeypatch):
+    calls = []
+
+    def fake_decode(data, file_format, sample_rate):
+        calls.append(data)
+        return np.full((len(data) * 100, 2), len(data) / 10, dtype=np.float32)
+
+    monkeypatch.setattr(decode_cache, "decode_audio", fake_decode)
+    return calls
+
+
+def test_decode_cache_serves_repeat_inputs_from_memory_map(tmp_path, monkeypatch):
+    calls = _fake_decoder(monkeypatch)
+    cache = DecodedAudioCache(root_dir=str(tmp_path))
+    first = cache.decode(b"bgm", "mp3")
+    second = cache.decode(b"bgm", "mp3")
+    assert calls == [b"bgm"]
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, second)
+
+    # a different target sample rate is a different entry
+    cache.decode(b"bgm", "mp3", sample_rate=48000)
+    assert calls == [b"bgm", b"bgm"]
+
+
+def test_decode_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    calls = _fake_decoder(monkeypatch)
+    entry_bytes = 300 * 2 * 4
+    cache = DecodedAudioCache(root_dir=str(tmp_path), max_bytes=int(entry_bytes * 2.5))
+    for index, data in enumerate([b"aaa", b"bbb", b"ccc"]):
+        cache.decode(data, "wav")
+        for name in os.listdir(tmp_path):
+            # make the order of use explicit regardless of the file system's timestamp resolution
+            path = os.path.join(tmp_path, name)
+            os.utime(path, (os.path.getmtime(path) - 10, os.path.getmtime(path) - 10))
+        if index == 1:
+            cache.decode(b"aaa", "wav")
+
+    assert len(os.listdir(tmp_path)) == 2
+    cache.decode(b"aaa", "wav")
+    cache.decode(b"bbb", "wav")
+    assert calls == [b"aaa", b"bbb", b"ccc", b"bbb"]
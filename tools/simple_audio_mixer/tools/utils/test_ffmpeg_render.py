@@ -0,0 +1,12 @@
+import numpy as np
+
+from tools.utils.ffmpeg_render import envelope_expression
+
+
+def test_envelope_expression_skips_zero_length_segments():
+    times_ms = np.array([0.0, 1000.0, 1000.0, 3000.0])
+    gains = np.array([0.0, 1.0, 0.5, 0.0])
+    assert envelope_expression(times_ms, gains) == (
+        "if(lt(t,1.000000),0.000000+1.000000*(t-0.000000),"
+        "if(lt(t,3.000000),0.500000+-0.250000*(t-1.000000),0.000000))"
+    )
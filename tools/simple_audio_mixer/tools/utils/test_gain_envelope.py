@@ -0,0 +1,90 @@
+import numpy as np
+
+from tools.utils.audio_stream import ArrayReader
+from tools.utils.gain_envelope import (
+    BGMMixSettings,
+    build_bgm_envelope,
+    build_ducking_curve,
+    iter_bgm_mix_blocks,
+    measure_frame_rms,
+    render_bgm_mix,
+    render_gain,
+)
+
+
+def _settings():
+    return BGMMixSettings(
+        intro_fadein_ms=10,
+        intro_play_ms=20,
+        intro_fadeout_ms=10,
+        pre_voice_delay_ms=10,
+        post_voice_delay_ms=10,
+        outro_fadein_ms=10,
+        outro_play_ms=20,
+        outro_fadeout_ms=10,
+        bgm_intro_volume_ratio=1.0,
+        bgm_during_voice_volume_ratio=0.2,
+        bgm_outro_volume_ratio=0.5,
+        master_volume_ratio=0.5,
+    )
+
+
+def test_build_bgm_envelope_breakpoints():
+    times, gains = build_bgm_envelope(_settings(), voice_ms=100)
+    assert times.tolist() == [0, 10, 30, 40, 160, 170, 190, 200]
+    np.testing.assert_allclose(gains, [0.0, 0.5, 0.5, 0.1, 0.1, 0.25, 0.25, 0.0])
+
+
+def test_render_gain_interpolates_fades():
+    envelope = build_bgm_envelope(_settings(), voice_ms=100)
+    gain = render_gain(envelope, start_frame=0, frames=11, sample_rate=1000)
+    np.testing.assert_allclose(gain, np.linspace(0.0, 0.5, 11), atol=1e-6)
+
+
+def test_render_bgm_mix_places_voice_after_intro():
+    sample_rate = 1000
+    voice = np.ones((100, 1), dtype=np.float32)
+    bgm = np.zeros((7, 2), dtype=np.float32)
+    mixed = render_bgm_mix(voice, bgm, _settings(), sample_rate)
+    assert mixed.shape == (200, 2)
+    assert not mixed[:50].any()
+    np.testing.assert_allclose(mixed[50:150], 0.5)
+    assert not mixed[150:].any()
+
+
+def test_iter_bgm_mix_blocks_matches_full_render_for_any_block_size():
+    sample_rate = 1000
+    rng = np.random.default_rng(0)
+    voice = rng.uniform(-0.5, 0.5, (97, 1)).astype(np.float32)
+    bgm = rng.uniform(-0.5, 0.5, (13, 2)).astype(np.float32)
+    expected = render_bgm_mix(voice, bgm, _settings(), sample_rate)
+    for block_frames in (7, 64, 1000):
+        blocks = iter_bgm_mix_blocks(ArrayReader(voice), bgm, _settings(), sample_rate, block_frames=block_frames)
+        np.testing.assert_allclose(np.concatenate([block for _, block in blocks]), expected, atol=1e-6)
+
+
+def test_ducking_curve_raises_bgm_during_voice_pauses():
+    sample_rate = 1000
+    settings = BGMMixSettings(
+        **{**_settings().__dict__, "auto_ducking": True, "ducking_attack_ms": 10, "ducking_release_ms": 10}
+    )
+    # 200 ms of speech, 300 ms of pause, 200 ms of speech
+    voice = np.zeros((700, 1), dtype=np.float32)
+    voice[:200] = 0.5
+    voice[500:] = 0.5
+    frame_rms, voice_frames = measure_frame_rms(ArrayReader(voice), frame_samples=10)
+    assert voice_frames == 700
+    np.testing.assert_allclose(frame_rms[:20], 0.5)
+
+    ducking = build_ducking_curve(frame_rms, voice_frames, settings, sample_rate, frame_samples=10)
+    gain_at = dict(zip(ducking.times_ms.tolist(), ducking.gains.tolist()))
+    assert gain_at[0] == 0.2 and gain_at[200] == 0.2
+    assert abs(gain_at[450] - 0.5) < 1e-3
+    assert abs(gain_at[700] - 0.2) < 1e-3
+
+    times, gains = build_bgm_envelope(settings, voice_ms=700, ducking=ducking)
+    assert np.all(np.diff(times) >= 0)
+    # Outside the voice section the envelope is unchanged; the master volume still applies
+    assert times[:4].tolist() == [0, 10, 30, 40]
+    assert times[-3:].tolist() == [770, 790, 800]
+    assert abs(float(np.interp(50 + 450, times, gains)) - 0.25) < 1e-3
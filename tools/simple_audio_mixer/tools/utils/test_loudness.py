@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+from tools.utils.loudness import (
+    DEFAULT_TRUE_PEAK_LIMIT_DBTP,
+    LoudnessSettings,
+    integrated_loudness,
+    limit_true_peak,
+    normalize_loudness,
+    true_peak_envelope,
+)
+
+
+def _sine(amplitude, sample_rate=48000, seconds=5.0, frequency=1000.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def test_integrated_loudness_matches_reference_sine():
+    # a 0 dBFS 1 kHz sine in one channel reads -3.01 LUFS (ITU-R BS.1770)
+    one_channel = np.stack([_sine(1.0), np.zeros(240000, dtype=np.float32)], axis=1)
+    assert abs(integrated_loudness(one_channel, 48000) - (-3.01)) < 0.05
+
+    stereo = np.stack([_sine(0.1, sample_rate=44100)] * 2, axis=1)
+    assert abs(integrated_loudness(stereo, 44100) - (-20.0)) < 0.05
+
+
+def test_integrated_loudness_gates_silence():
+    signal = np.stack([_sine(0.1)] * 2, axis=1)
+    with_silence = np.concatenate([signal, np.zeros((len(signal) * 4, 2), dtype=np.float32)])
+    # ungated, four times as much silence would pull the loudness down by 7 dB; only the
+    # few blocks straddling the end of the signal remain
+    assert abs(integrated_loudness(with_silence, 48000) - integrated_loudness(signal, 48000)) < 0.2
+    assert integrated_loudness(np.zeros_like(signal), 48000) == -math.inf
+
+
+def test_true_peak_envelope_finds_inter_sample_peaks():
+    # a quarter-rate sine sampled 45 degrees off its crests peaks 3 dB above its samples
+    samples = np.sin(np.pi / 2 * np.arange(4000) + np.pi / 4).astype(np.float32)[:, np.newaxis]
+    assert abs(float(np.abs(samples).max()) - math.sqrt(0.5)) < 1e-6
+    assert true_peak_envelope(samples)[100:-100].max() > 0.98
+
+
+def test_normalize_loudness_hits_target_under_true_peak_limit():
+    rng = np.random.default_rng(0)
+    mix = (rng.standard_normal((44100 * 10, 2)) * 0.05).astype(np.float32)
+    normalized = normalize_loudness(mix, 44100, target_lufs=-9.0, true_peak_dbtp=-1.0)
+    assert 20 * math.log10(true_peak_envelope(normalized).max()) <= -1.0 + 0.05
+    # the limiter only shaves peaks off, so the loudness stays close to the target
+    assert abs(integrated_loudness(normalized, 44100) - (-9.0)) < 1.0
+
+
+def test_limit_true_peak_leaves_quiet_audio_untouched():
+    quiet = np.stack([_sine(0.1)] * 2, axis=1)
+    assert limit_true_peak(quiet, -1.0, 48000) is quiet
+
+
+def test_loudness_settings_from_tool_parameters():
+    assert not LoudnessSettings.from_tool_parameters({}).enabled
+    settings = LoudnessSettings.from_tool_parameters({"loudness_target_lufs": -16, "true_peak_limit_dbtp": None})
+    assert settings == LoudnessSettings(target_lufs=-16.0, true_peak_limit_dbtp=DEFAULT_TRUE_PEAK_LIMIT_DBTP)
+    with pytest.raises(ValueError):
+        LoudnessSettings.from_tool_parameters({"loudness_target_lufs": -16, "render_mode": "ffmpeg"})
+
+
+def test_loudness_settings_apply_only_when_enabled():
+    samples = np.stack([_sine(0.1)] * 2, axis=1)
+    assert LoudnessSettings().apply(samples, 48000) is samples
+    normalized = LoudnessSettings(target_lufs=-16.0).apply(samples, 48000)
+    assert integrated_loudness(normalized, 48000) == pytest.approx(-16.0, abs=0.5)
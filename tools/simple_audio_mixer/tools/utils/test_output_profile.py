@@ -0,0 +1,31 @@
+import pytest
+
+from tools.utils.output_profile import OutputSettings
+
+
+def test_output_settings_defaults_keep_previous_output():
+    output = OutputSettings.from_tool_parameters({"output_format": "mp3"})
+    assert output.encoder_arguments(44100) == ["-ar", "44100", "-ac", "2", "-acodec", "libmp3lame", "-f", "mp3", "-b:a", "160k"]
+    assert output.profile.mime_type == "audio/mpeg"
+
+
+def test_output_settings_native_rate_mono_and_bitrate():
+    output = OutputSettings.from_tool_parameters(
+        {"output_format": "aac", "output_sample_rate": "native", "output_channels": "mono", "output_bitrate_kbps": 64}
+    )
+    assert output.sample_rate is None
+    assert output.encoder_arguments(48000)[:4] == ["-ar", "48000", "-ac", "1"]
+    assert output.encoder_arguments(48000)[-2:] == ["-b:a", "64k"]
+
+
+def test_output_settings_resamples_only_for_restricted_encoders():
+    assert OutputSettings("opus").encoder_arguments(44100)[:2] == ["-ar", "48000"]
+    assert OutputSettings("opus").encoder_arguments(16000)[:2] == ["-ar", "16000"]
+    # bitrates do not apply to lossless and VBR profiles
+    assert "-b:a" not in OutputSettings("flac", bitrate_kbps=320).encoder_arguments(44100)
+    assert "-b:a" not in OutputSettings("mp3_vbr", bitrate_kbps=320).encoder_arguments(44100)
+
+
+def test_output_settings_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        OutputSettings("wma")
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from tools.utils.audio_engine import decode_audio
+from tools.utils.audio_stream import encode_audio
+from tools.utils.output_profile import OutputSettings
+from tools.utils.stereo_mix import mix_audio_files
+
+SAMPLE_RATE = 8000
+
+
+def wav_file(value: float, frames: int) -> SimpleNamespace:
+    samples = np.full((frames, 1), value, dtype=np.float32)
+    blob = encode_audio(samples, OutputSettings("wav", SAMPLE_RATE, 1), SAMPLE_RATE)
+    return SimpleNamespace(blob=blob, extension=".wav")
+
+
+@pytest.mark.parametrize("render_mode", ["memory", "streaming", "ffmpeg"])
+def test_mix_audio_files_pans_and_pads_in_every_render_mode(render_mode):
+    files = [wav_file(0.25, SAMPLE_RATE), wav_file(0.25, SAMPLE_RATE // 2)]
+    blob, mime_type = mix_audio_files(
+        files,
+        [-1.0, 1.0, 0.0],  # extra values are ignored
+        [1.0, 0.5, 1.0],
+        {"output_format": "wav", "output_sample_rate": str(SAMPLE_RATE), "render_mode": render_mode},
+    )
+    assert mime_type == "audio/wav"
+
+    mixed = decode_audio(blob, "wav", SAMPLE_RATE)
+    assert len(mixed) == pytest.approx(SAMPLE_RATE, abs=SAMPLE_RATE // 100)
+    middle = SAMPLE_RATE // 4
+    np.testing.assert_allclose(mixed[middle], [0.25 * np.sqrt(2.0), 0.125 * np.sqrt(2.0)], atol=1e-2)
+    np.testing.assert_allclose(mixed[middle * 3], [0.25 * np.sqrt(2.0), 0.0], atol=1e-2)
+
+
+def test_mix_audio_files_rejects_loudness_outside_memory_mode():
+    with pytest.raises(ValueError):
+        mix_audio_files(
+            [wav_file(0.25, SAMPLE_RATE)], [0.0], [1.0], {"render_mode": "streaming", "loudness_target_lufs": -16}
+        )